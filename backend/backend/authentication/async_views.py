@@ -0,0 +1,15 @@
+from django.http import HttpResponseNotAllowed, JsonResponse
+from .caching import aauthenticate
+from .serializers import UserSerializer
+
+async def user_details(request):
+    """
+    Async version of user_details: get the details of the currently authenticated user.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return JsonResponse(UserSerializer(user).data)
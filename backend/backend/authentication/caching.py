@@ -0,0 +1,99 @@
+# caching.py
+
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+
+def token_cache():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    # Hash the token so raw credentials never appear as cache keys
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_cached_token(key):
+    """
+    Drop a token from the cache, e.g. after logout or a change to its user.
+    """
+    token_cache().delete(token_cache_key(key))
+
+
+# User fields kept in the cache; the password hash is left out and stays deferred
+CACHED_USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields if field.attname != 'password'
+)
+
+
+def cache_token(key, token):
+    token_cache().set(
+        token_cache_key(key),
+        tuple(getattr(token.user, name) for name in CACHED_USER_FIELDS),
+        settings.AUTH_TOKEN_CACHE_TIMEOUT,
+    )
+
+
+def token_from_cache(key, values):
+    """
+    Rebuild (user, token) from cached user field values. The user is loaded as
+    from a deferred query, so saving it only writes the cached fields.
+    """
+    user = User.from_db(None, CACHED_USER_FIELDS, values)
+    token = Token.from_db(None, ('key', 'user_id'), (key, user.pk))
+    token.user = user
+    return user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps token -> user lookups in the Django cache
+    for AUTH_TOKEN_CACHE_TIMEOUT seconds, so warm tokens cost no queries.
+    """
+
+    def authenticate_credentials(self, key):
+        values = token_cache().get(token_cache_key(key))
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            cache_token(key, token)
+            return (user, token)
+
+        user, token = token_from_cache(key, values)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return (user, token)
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachedTokenAuthentication for plain Django async views.
+    Returns the authenticated user, or None if the request has no valid token.
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        return None
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return None
+
+    values = await token_cache().aget(token_cache_key(key))
+    if values is None:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        await sync_to_async(cache_token)(key, token)
+        user = token.user
+    else:
+        user, _ = token_from_cache(key, values)
+    if not user.is_active:
+        return None
+    return user
@@ -0,0 +1,59 @@
+# hashing.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_executor = None
+_pending = 0
+_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix='password-hash',
+            )
+        return _executor
+
+
+def verify_password(user, password):
+    """
+    Check a password on the bounded hashing pool instead of the request thread.
+    The hashers release the GIL, so at most PASSWORD_HASH_WORKERS cores hash at
+    once. HashingBusy is raised instead of queueing once PASSWORD_HASH_QUEUE_LIMIT
+    checks are already waiting. A missing user still pays for one hash, so
+    response times do not reveal which usernames exist.
+    """
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_HASH_QUEUE_LIMIT:
+            raise HashingBusy()
+        _pending += 1
+
+    try:
+        executor = get_executor()
+        if user is None:
+            executor.submit(make_password, password).result()
+            return False
+        # The setter only records that the hash should be upgraded; the save
+        # happens below on the request thread and its database connection
+        needs_upgrade = []
+        valid = executor.submit(check_password, password, user.password, needs_upgrade.append).result()
+    finally:
+        with _lock:
+            _pending -= 1
+
+    if valid and needs_upgrade:
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    return valid
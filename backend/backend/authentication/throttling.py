@@ -0,0 +1,125 @@
+# throttling.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse a DRF style rate such as '10/min' into (requests, seconds).
+    """
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    """
+    In-process token buckets. Each key holds up to `capacity` tokens, refilled
+    continuously at capacity/period per second. Only the least recently used
+    max_keys buckets are kept.
+    """
+
+    def __init__(self, max_keys, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        """
+        Take one token for key. Returns 0 if allowed, otherwise the seconds until
+        a token is available.
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * capacity / period)
+            # Tolerate float drift from many small refills
+            if tokens >= 1 - 1e-9:
+                tokens = max(tokens - 1, 0)
+                wait = 0
+            else:
+                wait = (1 - tokens) * period / capacity
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheWindowStore:
+    """
+    Sliding-window counters in a Django cache shared by all workers, e.g. Redis.
+    The window is approximated by weighting the previous fixed window by how much
+    of it still overlaps; every attempt counts, including rejected ones.
+    """
+
+    def __init__(self, alias, clock=time.time):
+        self.alias = alias
+        self.clock = clock
+
+    def consume(self, key, capacity, period):
+        cache = caches[self.alias]
+        now = self.clock()
+        window, elapsed = divmod(now, period)
+        current_key = f'throttle:{key}:{int(window)}'
+        cache.add(current_key, 0, period * 2)
+        current = cache.incr(current_key)
+        previous = cache.get(f'throttle:{key}:{int(window) - 1}', 0)
+        if previous * (1 - elapsed / period) + current <= capacity:
+            return 0
+        return period - elapsed
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+local_store = TokenBucketStore(max_keys=settings.AUTH_THROTTLE_MAX_KEYS)
+
+
+def get_store():
+    if settings.AUTH_THROTTLE_BACKEND == 'cache':
+        return CacheWindowStore(settings.AUTH_THROTTLE_CACHE_ALIAS)
+    return local_store
+
+
+class AuthRateThrottle(BaseThrottle):
+    """
+    Throttle credential endpoints per client IP and per submitted username,
+    using the rates in AUTH_THROTTLE_RATES. DRF checks throttles before the view
+    runs, so rejected attempts cost no hashing or database work.
+    """
+    scope = 'auth'
+
+    def allow_request(self, request, view):
+        store = get_store()
+        rates = settings.AUTH_THROTTLE_RATES
+
+        waits = [store.consume(f'{self.scope}:ip:{self.get_ident(request)}', *parse_rate(rates['ip']))]
+        username = request.data.get('username') if isinstance(request.data, dict) else None
+        if isinstance(username, str) and username:
+            waits.append(store.consume(f'{self.scope}:username:{username.lower()}', *parse_rate(rates['username'])))
+
+        self._wait = max(waits)
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class LoginRateThrottle(AuthRateThrottle):
+    scope = 'login'
+
+
+class RegisterRateThrottle(AuthRateThrottle):
+    scope = 'register'
@@ -10,6 +10,7 @@ from .views import (
     get_user_by_id,
     get_user_by_username
 )
+from . import async_views
 
 urlpatterns = [
     path('register/', register, name='auth_register'),
@@ -18,6 +19,7 @@ urlpatterns = [
     path('logout/', logout, name='auth_logout'),
     path('delete/', delete_user, name="auth_delete_user"),
     path('update/', update_user, name='auth_update'),
+    path('async/user/', async_views.user_details, name='async_user_details'),
     
     # First the integer ID, then the string username to avoid conflicts
     path('get/<int:id>/', get_user_by_id, name='get_user_by_id'),
@@ -1,14 +1,20 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
+from backend.budget.versioning import bump_versions
+from backend.models import UserBudgetMap
 from .serializers import RegisterSerializer, UserSerializer
+from .caching import invalidate_cached_token
+from .hashing import HashingBusy, verify_password
+from .throttling import LoginRateThrottle, RegisterRateThrottle
 
 # Register View (User Registration)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterRateThrottle])
 def register(request):
     """
     Register a new user and return the user data and token.
@@ -26,15 +32,27 @@ def register(request):
 # Custom Auth Token (Login)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login(request):
     """
     Login a user by providing credentials and return a token.
     """
     username = request.data.get('username')
     password = request.data.get('password')
-    user = User.objects.filter(username=username).first()
-    if user and user.check_password(password):
-        token, created = Token.objects.get_or_create(user=user)
+    # Fetch the user's token in the same query
+    user = User.objects.select_related('auth_token').filter(username=username).first()
+    try:
+        valid = verify_password(user, password)
+    except HashingBusy:
+        return Response(
+            {'detail': 'Too many logins in progress, please try again.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    if valid:
+        try:
+            token = user.auth_token
+        except Token.DoesNotExist:
+            token, created = Token.objects.get_or_create(user=user)
         return Response({
             'token': token.key,
             'user': UserSerializer(user).data
@@ -59,6 +77,11 @@ def delete_user(request):
     Delete the currently authenticated user.
     """
     user = request.user
+    if request.auth is not None:
+        invalidate_cached_token(request.auth.key)
+    # Other members' cached member lists still show the user; bump while the
+    # user's UserBudgetMap rows exist
+    bump_versions(list(UserBudgetMap.objects.filter(user=user).values_list('budget_id', flat=True)))
     user.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -69,7 +92,9 @@ def logout(request):
     """
     Log out the user by deleting their auth token.
     """
-    request.user.auth_token.delete()
+    token = request.user.auth_token
+    invalidate_cached_token(token.key)
+    token.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 # Get User by ID
@@ -106,8 +131,14 @@ def update_user(request):
     Update the details of the currently authenticated user.
     """
     user = request.user
+    username = user.username
     serializer = UserSerializer(user, data=request.data)
     if serializer.is_valid():
         updated_user = serializer.save()
+        if request.auth is not None:
+            invalidate_cached_token(request.auth.key)
+        if updated_user.username != username:
+            # Member lists of the user's budgets show the username
+            bump_versions(UserBudgetMap.objects.filter(user=updated_user).values('budget_id'))
         return Response(UserSerializer(updated_user).data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
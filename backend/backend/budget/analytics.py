@@ -0,0 +1,65 @@
+# analytics.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Max, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from backend.models import DailyCategorySpend
+
+# How each interval buckets the rollup date; a DateField is already a day bucket
+INTERVALS = {
+    'day': F('date'),
+    'week': TruncWeek('date'),
+    'month': TruncMonth('date'),
+}
+
+
+class InvalidWindow(Exception):
+    pass
+
+
+def day_window(budget, start=None, end=None):
+    """
+    Resolve the dates a daily series covers, at most BUDGET_ANALYTICS_MAX_DAYS
+    long. A missing end follows from start, or else is the budget's latest day
+    with spending, so the default window only moves when expenses change (and
+    the budget version with them). Returns (start, end); both are None when the
+    budget has no spending yet.
+    """
+    span = timedelta(days=settings.BUDGET_ANALYTICS_MAX_DAYS - 1)
+    if start is None and end is None:
+        end = DailyCategorySpend.objects.filter(category__budget=budget).aggregate(latest=Max('date'))['latest']
+        if end is None:
+            return None, None
+    try:
+        if end is None:
+            end = start + span
+        if start is None:
+            start = end - span
+    except OverflowError:
+        # The window would run past date.min or date.max
+        raise InvalidWindow()
+    if start > end or end - start > span:
+        raise InvalidWindow()
+    return start, end
+
+
+def spending_by_period(budget, interval, start=None, end=None):
+    """
+    Total cost, payback and count of a budget's expenses per category and period,
+    grouped in the database from the DailyCategorySpend rollup, optionally only
+    for dates between start and end (inclusive).
+    """
+    rows = DailyCategorySpend.objects.filter(category__budget=budget)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    return rows.annotate(
+        period=INTERVALS[interval],
+    ).values('period', 'category_id', 'category__name').annotate(
+        total_cost=Sum('total_cost'),
+        total_payback=Sum('total_payback'),
+        expense_count=Sum('expense_count'),
+    ).order_by('period', 'category_id')
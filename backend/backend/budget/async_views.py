@@ -0,0 +1,49 @@
+from django.http import HttpResponseNotAllowed, JsonResponse
+from backend.models import Budget
+from backend.authentication.caching import aauthenticate
+from backend.budget.serializers import BudgetSerializer
+from backend.budget.pagination import keyset_queryset, split_page, InvalidCursor
+
+# Async versions of the budget read endpoints. They answer with the same JSON as
+# the DRF views in views.py, but hold no worker thread while waiting on the database.
+
+NOT_AUTHENTICATED = {'detail': 'Authentication credentials were not provided.'}
+
+async def get_budget(request, id):
+    """
+    Get budget by id, if it belongs to the current user
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=401)
+
+    try:
+        budget = await Budget.objects.for_user(user).aget(pk=id)
+    except Budget.DoesNotExist:
+        return JsonResponse({'detail': 'Budget not found.'}, status=404)
+
+    return JsonResponse(BudgetSerializer(budget).data)
+
+async def get_all_current_budgets(request):
+    """
+    Get all of the current user's budgets with no end date, one page at a time.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse(NOT_AUTHENTICATED, status=401)
+
+    budgets = Budget.objects.for_user(user).filter(end_date__isnull=True)
+    try:
+        queryset, page_size = keyset_queryset(budgets, request.GET)
+    except InvalidCursor:
+        return JsonResponse({'detail': 'Invalid cursor.'}, status=400)
+
+    page, next_cursor = split_page([budget async for budget in queryset], page_size)
+
+    return JsonResponse({'results': BudgetSerializer(page, many=True).data, 'next': next_cursor})
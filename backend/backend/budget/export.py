@@ -0,0 +1,75 @@
+# export.py
+
+import csv
+import json
+
+from django.conf import settings
+from backend.models import Expense
+
+# Column name -> Expense lookup, in output order
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('date', 'date'),
+    ('store', 'store'),
+    ('cost', 'cost'),
+    ('payback_amount', 'payback_amount'),
+    ('notes', 'notes'),
+    ('category', 'category__name'),
+)
+
+
+class Echo:
+    """
+    File-like object whose write returns the value, so csv.writer can encode one
+    row at a time for a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def expense_queryset(budget):
+    """
+    A budget's expenses as plain tuples in export column order, by id.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    return Expense.objects.filter(category__budget=budget).order_by('id').values_list(*lookups)
+
+
+def expense_rows(budget):
+    """
+    Yield a budget's expenses without building model instances, reading
+    EXPENSE_EXPORT_CHUNK_SIZE rows per query after the last id seen. Each chunk is
+    its own bounded query, so memory stays flat even with drivers such as
+    mysqlclient that buffer a whole result set on the client.
+    """
+    queryset = expense_queryset(budget)
+    chunk_size = settings.EXPENSE_EXPORT_CHUNK_SIZE
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        # id is the first export column
+        last_id = chunk[-1][0]
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        # str() renders Decimal as '10.00' and dates in ISO format
+        yield json.dumps(dict(zip(names, row)), default=str) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,101 @@
+# pagination.py
+
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(start_date, pk):
+    """
+    Encode the (start_date, id) position of the last row on a page as an opaque token.
+    """
+    raw = json.dumps([start_date.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by encode_cursor back into a (start_date, id) tuple.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        start_date, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(start_date), checked_pk(pk)
+    except (ValueError, TypeError, OverflowError):
+        raise InvalidCursor()
+
+
+def checked_pk(value):
+    """
+    Convert a cursor's id to an int, rejecting values outside the 64-bit range of
+    the id columns, which the database driver would fail on.
+    """
+    pk = int(value)
+    if not 0 < pk < 2 ** 63:
+        raise InvalidCursor()
+    return pk
+
+
+def get_page_size(params):
+    """
+    Read the requested page size from the query string, clamped to MAX_PAGE_SIZE.
+    """
+    try:
+        page_size = int(params.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def keyset_queryset(queryset, params):
+    """
+    Narrow a Budget queryset to the page after the requested cursor, ordered by
+    (start_date, id). Seeking past the cursor keeps every page an index range scan,
+    so deep pages cost the same as the first one.
+    Returns the sliced queryset, which holds one extra row, and the page size.
+    """
+    page_size = get_page_size(params)
+    queryset = queryset.order_by('start_date', 'id')
+
+    token = params.get('cursor')
+    if token:
+        start_date, pk = decode_cursor(token)
+        queryset = queryset.filter(
+            Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=pk)
+        )
+
+    # Fetch one extra row to find out whether another page exists
+    return queryset[:page_size + 1], page_size
+
+
+def split_page(rows, page_size):
+    """
+    Trim the extra row fetched by keyset_queryset and build the next cursor from it.
+    Rows may be Budget instances or values() dicts.
+    """
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['start_date'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.start_date, last.id)
+    return rows, next_cursor
+
+
+def keyset_paginate(queryset, params):
+    """
+    Return one page of a Budget queryset and the cursor for the next page.
+    """
+    queryset, page_size = keyset_queryset(queryset, params)
+    return split_page(list(queryset), page_size)
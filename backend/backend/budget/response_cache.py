@@ -0,0 +1,88 @@
+# response_cache.py
+
+import functools
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from backend.budget.versioning import conditional_get, set_validators
+
+# Hit/miss counts for this process, exposed by the metrics endpoint
+stats = {'hit': 0, 'miss': 0}
+_stats_lock = threading.Lock()
+
+
+def _record(outcome):
+    with _stats_lock:
+        stats[outcome] += 1
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def response_cache_key(request, validators):
+    """
+    Key a cached response on the user's budget version (carried in the ETag) and the
+    full path. A write bumps the version, so stale entries are never read again and
+    age out of the cache.
+    """
+    etag, _ = validators
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'budget-response:{etag.strip(chr(34))}:{path}'
+
+
+def get_cached_response(key):
+    """
+    Return the cached JSON for key as an HttpResponse, or None on a miss.
+    """
+    content = response_cache().get(key)
+    if content is None:
+        _record('miss')
+        return None
+    _record('hit')
+    return HttpResponse(content, content_type='application/json')
+
+
+def cache_response(key, response):
+    """
+    Store the rendered bytes of a DRF Response once it is rendered, if it is a
+    successful JSON response no larger than RESPONSE_CACHE_MAX_BYTES.
+    """
+    def store(rendered):
+        if (
+            rendered.status_code == 200
+            and rendered.accepted_renderer.format == 'json'
+            and len(rendered.content) <= settings.RESPONSE_CACHE_MAX_BYTES
+        ):
+            response_cache().set(key, rendered.content, settings.RESPONSE_CACHE_TIMEOUT)
+
+    response.add_post_render_callback(store)
+    return response
+
+
+def cached_budget_read(view):
+    """
+    Decorate a budget read view so it answers 304 when the client's ETag is
+    current, serves the cached JSON when present, and caches successful responses.
+    Place it below @permission_classes so it runs on the authenticated request.
+    """
+    @functools.wraps(view)
+    def wrapped(request, *args, **kwargs):
+        not_modified, validators = conditional_get(request, request.user)
+        if not_modified is not None:
+            return not_modified
+
+        key = response_cache_key(request, validators)
+        cached = get_cached_response(key)
+        if cached is not None:
+            return set_validators(cached, validators)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(cache_response(key, response), validators)
+        return response
+
+    return wrapped
@@ -0,0 +1,141 @@
+# search.py
+
+import bisect
+import re
+import threading
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import FloatField, Func, Q, Value
+from backend.budget.pagination import decode_cursor, encode_cursor, get_page_size
+
+# Name of the MySQL FULLTEXT index over Expense (store, notes), see migration 0010
+FULLTEXT_INDEX = 'expense_store_notes_ft'
+
+# Inverted indexes kept per (user id, budget version) by the fallback search
+MAX_CACHED_INDEXES = 16
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class Match(Func):
+    """
+    MySQL MATCH (columns) AGAINST (query IN BOOLEAN MODE) relevance score.
+    """
+    output_field = FloatField()
+
+    def __init__(self, *columns, against):
+        super().__init__(*columns, Value(against))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        *columns, against = self.get_source_expressions()
+        column_sql = []
+        params = []
+        for column in columns:
+            sql, column_params = compiler.compile(column)
+            column_sql.append(sql)
+            params.extend(column_params)
+        against_sql, against_params = compiler.compile(against)
+        return (
+            f"MATCH ({', '.join(column_sql)}) AGAINST ({against_sql} IN BOOLEAN MODE)",
+            params + list(against_params),
+        )
+
+
+class InvertedIndex:
+    """
+    Token -> expense id postings over store and notes, for databases without a
+    full-text index. Terms match as prefixes and all of them must match, like the
+    '+term*' boolean query used on MySQL.
+    """
+
+    def __init__(self, rows):
+        postings = {}
+        for pk, store, notes in rows:
+            for token in set(tokenize(store)) | set(tokenize(notes)):
+                postings.setdefault(token, set()).add(pk)
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    def lookup(self, prefix):
+        ids = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self.postings[token]
+        return ids
+
+    def search(self, terms):
+        matches = None
+        for term in terms:
+            ids = self.lookup(term)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return set()
+        return matches or set()
+
+
+inverted_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_inverted_index(queryset, cache_key):
+    """
+    Return the inverted index over queryset, built once per cache_key.
+    """
+    with _indexes_lock:
+        index = inverted_indexes.get(cache_key)
+        if index is not None:
+            inverted_indexes.move_to_end(cache_key)
+            return index
+
+    index = InvertedIndex(queryset.values_list('id', 'store', 'notes').iterator())
+    with _indexes_lock:
+        inverted_indexes[cache_key] = index
+        while len(inverted_indexes) > MAX_CACHED_INDEXES:
+            inverted_indexes.popitem(last=False)
+    return index
+
+
+def search_expenses(queryset, query, cache_key):
+    """
+    Narrow an Expense queryset to rows whose store or notes contain every term of
+    query (as a prefix). Uses the FULLTEXT index on MySQL and a cached in-process
+    inverted index keyed on cache_key elsewhere.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+
+    if connections[queryset.db].vendor == 'mysql':
+        against = ' '.join(f'+{term}*' for term in terms)
+        return queryset.alias(relevance=Match('store', 'notes', against=against)).filter(relevance__gt=0)
+
+    index = get_inverted_index(queryset, cache_key)
+    return queryset.filter(id__in=index.search(terms))
+
+
+def paginate_expenses(queryset, params):
+    """
+    Return one page of an Expense queryset, newest first, and the cursor for the
+    next page. Seeks past the (date, id) cursor like keyset_queryset.
+    """
+    page_size = get_page_size(params)
+    queryset = queryset.order_by('-date', '-id')
+
+    token = params.get('cursor')
+    if token:
+        last_date, pk = decode_cursor(token)
+        queryset = queryset.filter(Q(date__lt=last_date) | Q(date=last_date, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return rows, next_cursor
@@ -1,9 +1,106 @@
 # serializers.py
 
+from django.conf import settings
 from rest_framework import serializers
-from backend.models import Budget
+from backend.models import Budget, Category, Expense
 
 class BudgetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Budget
         fields = ['id', 'name', 'start_date', 'end_date']
+
+class RolloverSerializer(serializers.Serializer):
+    # Both optional: the new budget keeps the old name, and the old budget closes
+    # on its existing end date or today
+    name = serializers.CharField(max_length=100, required=False)
+    end_date = serializers.DateField(required=False)
+
+class MembershipSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        allow_empty=False,
+        max_length=settings.BUDGET_MEMBERS_MAX_USERNAMES,
+    )
+
+class BudgetMemberSerializer(serializers.Serializer):
+    # One UserBudgetMap values() row from list_budget_members
+    id = serializers.IntegerField(source='user_id')
+    username = serializers.CharField(source='user__username')
+    date_added = serializers.DateTimeField()
+
+class SpendingSerializer(serializers.Serializer):
+    # One row of backend.budget.analytics.spending_by_period
+    period = serializers.DateField()
+    category = serializers.IntegerField(source='category_id')
+    category_name = serializers.CharField(source='category__name')
+    total_cost = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_payback = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense_count = serializers.IntegerField()
+
+class CategorySerializer(serializers.ModelSerializer):
+    budget = serializers.IntegerField(source='budget_id', read_only=True)
+
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'start_amount', 'current_amount', 'budget']
+
+class CategorySummarySerializer(serializers.ModelSerializer):
+    # Aggregates annotated onto the queryset by get_budget_summary
+    total_cost = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_payback = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    expense_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'start_amount', 'current_amount', 'total_cost', 'total_payback', 'expense_count']
+
+class BudgetSummarySerializer(serializers.ModelSerializer):
+    categories = CategorySummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Budget
+        fields = ['id', 'name', 'start_date', 'end_date', 'categories']
+
+class ExpenseListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for bulk expense ingestion.
+    With the 'skip_invalid' context flag, invalid rows are collected in row_errors
+    instead of rejecting the whole list.
+    """
+
+    def to_internal_value(self, data):
+        if not self.context.get('skip_invalid'):
+            return super().to_internal_value(data)
+
+        self.row_errors = []
+        accepted = []
+        for index, item in enumerate(data):
+            try:
+                accepted.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.row_errors.append({'row': index, 'errors': exc.detail})
+        return accepted
+
+    def create(self, validated_data):
+        # Insert in batches rather than one save per row
+        expenses = [Expense(**item) for item in validated_data]
+        return Expense.objects.bulk_create(expenses, batch_size=settings.EXPENSE_BULK_BATCH_SIZE)
+
+class ExpenseSerializer(serializers.ModelSerializer):
+    # Plain id so validating many rows does not look up each category separately
+    category = serializers.IntegerField(source='category_id')
+
+    class Meta:
+        model = Expense
+        fields = ['id', 'cost', 'store', 'payback_amount', 'date', 'notes', 'category']
+        extra_kwargs = {
+            'notes': {'required': False, 'allow_blank': True, 'default': ''},
+        }
+        list_serializer_class = ExpenseListSerializer
+
+    def validate_category(self, value):
+        # 'category_ids' holds the ids of categories the user may write to
+        allowed = self.context.get('category_ids')
+        if allowed is not None and value not in allowed:
+            raise serializers.ValidationError('Category not found.')
+        return value
@@ -5,7 +5,18 @@ from .views import (
     get_budget,
     delete_budget,
     get_all_current_budgets,
+    get_budget_summary,
+    bulk_create_expenses,
+    export_expenses,
+    rollover_budget,
+    get_budget_analytics,
+    search_expenses_view,
+    list_budget_members,
+    add_budget_members,
+    remove_budget_members,
+    get_budget_changes,
 )
+from . import async_views
 
 urlpatterns = [
     path('create/', create_budget, name='create_budget'),
@@ -13,4 +24,18 @@ urlpatterns = [
     path('get/<int:id>/', get_budget, name='get_budget'),
     path('delete/<int:id>/', delete_budget, name='delete_budget'),
     path('get_all_current/', get_all_current_budgets, name='get_all_current_budgets'),
+    path('changes/', get_budget_changes, name='get_budget_changes'),
+    path('summary/<int:id>/', get_budget_summary, name='get_budget_summary'),
+    path('expenses/bulk/', bulk_create_expenses, name='bulk_create_expenses'),
+    path('expenses/search/', search_expenses_view, name='search_expenses'),
+    path('export/<int:id>/', export_expenses, name='export_expenses'),
+    path('rollover/<int:id>/', rollover_budget, name='rollover_budget'),
+    path('<int:id>/analytics/', get_budget_analytics, name='get_budget_analytics'),
+    path('<int:id>/members/', list_budget_members, name='list_budget_members'),
+    path('<int:id>/members/add/', add_budget_members, name='add_budget_members'),
+    path('<int:id>/members/remove/', remove_budget_members, name='remove_budget_members'),
+
+    # Async versions of the read endpoints
+    path('async/get/<int:id>/', async_views.get_budget, name='async_get_budget'),
+    path('async/get_all_current/', async_views.get_all_current_budgets, name='async_get_all_current_budgets'),
 ]
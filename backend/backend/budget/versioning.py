@@ -0,0 +1,75 @@
+# versioning.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from backend.models import BudgetVersion, UserBudgetMap
+
+
+def version_cache():
+    return caches[settings.BUDGET_VERSION_CACHE_ALIAS]
+
+
+def version_cache_key(user_id):
+    return f'budget-version:{user_id}'
+
+
+def get_version(user):
+    """
+    Return the user's (version, updated_at), from the cache when possible.
+    """
+    cache = version_cache()
+    key = version_cache_key(user.id)
+    cached = cache.get(key)
+    if cached is None:
+        budget_version, _ = BudgetVersion.objects.get_or_create(user=user)
+        cached = (budget_version.version, budget_version.updated_at)
+        cache.set(key, cached, settings.BUDGET_VERSION_CACHE_TIMEOUT)
+    return cached
+
+
+def bump_versions(budget_ids):
+    """
+    Bump the version of every user mapped to any of the given budgets.
+    Call before deleting a budget, while its UserBudgetMap rows still exist.
+    """
+    user_ids = list(
+        UserBudgetMap.objects.filter(budget_id__in=budget_ids).values_list('user_id', flat=True).distinct()
+    )
+    if not user_ids:
+        return
+    BudgetVersion.objects.filter(user_id__in=user_ids).update(
+        version=F('version') + 1,
+        updated_at=timezone.now(),
+    )
+
+    # Drop cached versions now and again on commit, so a read racing the
+    # transaction cannot leave the old version cached
+    keys = [version_cache_key(user_id) for user_id in user_ids]
+    version_cache().delete_many(keys)
+    transaction.on_commit(lambda: version_cache().delete_many(keys))
+
+
+def conditional_get(request, user):
+    """
+    Check If-None-Match/If-Modified-Since against the user's budget version.
+    Returns (not_modified_response_or_None, validators) where validators is passed
+    to set_validators on the full response.
+    """
+    version, updated_at = get_version(user)
+    etag = f'"{user.id}-{version}"'
+    last_modified = int(updated_at.timestamp())
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), (etag, last_modified)
+
+
+def set_validators(response, validators):
+    etag, last_modified = validators
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let browsers keep the response but revalidate it on every use
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
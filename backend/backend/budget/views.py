@@ -1,19 +1,52 @@
-from backend.models import Budget
-from rest_framework.decorators import api_view, permission_classes
+from datetime import date, timedelta
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from backend.models import Budget, Category, DailyCategorySpend, Expense, Tombstone, UserBudgetMap
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from backend.budget.serializers import BudgetSerializer
+from backend.budget.serializers import (
+    BudgetMemberSerializer,
+    BudgetSerializer,
+    BudgetSummarySerializer,
+    CategorySerializer,
+    ExpenseSerializer,
+    MembershipSerializer,
+    RolloverSerializer,
+    SpendingSerializer,
+)
+from backend.budget.parsers import NDJSONParser
+from backend.budget.export import EXPORT_FORMATS, expense_rows
+from backend.budget.analytics import INTERVALS, InvalidWindow, day_window, spending_by_period
+from backend.budget.pagination import keyset_queryset, split_page, InvalidCursor
+from backend.budget.fastjson import FastJSONRenderer, get_plan
+from backend.budget.search import paginate_expenses, search_expenses
+from backend.budget.sync import (
+    CHANGE_STREAMS, changes_page, decode_changes_cursor, encode_continuation, next_since, record_deletions,
+    tombstone_horizon,
+)
+from backend.budget.versioning import bump_versions, get_version
+from backend.budget.response_cache import cached_budget_read
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_budget(request):
     """
-    Create a new budget
+    Create a new budget owned by the current user
     """
     serializer = BudgetSerializer(data=request.data)
     if serializer.is_valid():
-        budget = serializer.save()
+        with transaction.atomic():
+            budget = serializer.save()
+            UserBudgetMap.objects.create(user=request.user, budget=budget)
+            bump_versions([budget.id])
         return Response(BudgetSerializer(budget).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -29,7 +62,7 @@ def update_budget(request):
 
     # Retrieve the budget by the provided 'id' from the request data
     try:
-        budget = Budget.objects.get(pk=request.data['id'])
+        budget = Budget.objects.for_user(request.user).get(pk=request.data['id'])
     except Budget.DoesNotExist:
         return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -38,19 +71,22 @@ def update_budget(request):
 
     # Check if the data is valid
     if serializer.is_valid():
-        updated_budget = serializer.save()  # Save the updated budget
+        with transaction.atomic():
+            updated_budget = serializer.save()  # Save the updated budget
+            bump_versions([updated_budget.id])
         return Response(BudgetSerializer(updated_budget).data, status=status.HTTP_200_OK)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_budget_read
 def get_budget(request, id):
     """
-    Get budget by id
+    Get budget by id, if it belongs to the current user
     """
     try:
-        budget = Budget.objects.get(pk=id)
+        budget = Budget.objects.for_user(request.user).get(pk=id)
     except Budget.DoesNotExist:
         return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -62,25 +98,423 @@ def get_budget(request, id):
 @permission_classes([IsAuthenticated])
 def delete_budget(request, id):
     """
-    Delete a budget
+    Delete a budget belonging to the current user
     """
     try:
-        budget = Budget.objects.get(pk=id)
-        budget.delete()
+        budget = Budget.objects.for_user(request.user).get(pk=id)
+        with transaction.atomic():
+            bump_versions([budget.id])
+            # Clients drop the budget's categories and expenses along with it
+            record_deletions(Tombstone.BUDGET, [budget.id], [budget.id])
+            budget.delete()
         return Response(status=status.HTTP_200_OK)
     except Budget.DoesNotExist:
         return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+@cached_budget_read
 def get_all_current_budgets(request):
     """
-    Get all current budgets (budgets with no end date)
+    Get all of the current user's budgets with no end date, one page at a time.
+    Pass the returned 'next' value as ?cursor= to fetch the following page.
     """
-    budgets = Budget.objects.filter(end_date__isnull=True)
-    
-    # Serialize the result
-    serializer = BudgetSerializer(budgets, many=True)
-    
+    budgets = Budget.objects.for_user(request.user).filter(end_date__isnull=True)
+
+    try:
+        budgets, page_size = keyset_queryset(budgets, request.query_params)
+    except InvalidCursor:
+        return Response({'detail': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Serialize values() rows with BudgetSerializer's precompiled field plan
+    plan = get_plan(BudgetSerializer)
+    page, next_cursor = split_page(list(budgets.values(*plan.lookups)), page_size)
+
+    return Response({'results': plan.serialize(page), 'next': next_cursor})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_budget_read
+def get_budget_summary(request, id):
+    """
+    Get a budget with per-category expense totals.
+    The totals are aggregated in the database so the query count does not grow
+    with the number of categories or expenses.
+    """
+    categories = Category.objects.with_expense_totals().order_by('name')
+
+    try:
+        budget = Budget.objects.for_user(request.user).prefetch_related(
+            Prefetch('categories', queryset=categories)
+        ).get(pk=id)
+    except Budget.DoesNotExist:
+        return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = BudgetSummarySerializer(budget)
+
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, NDJSONParser])
+def bulk_create_expenses(request):
+    """
+    Create many expenses from a JSON array or an NDJSON body.
+    Rows are inserted in batches in one transaction, then each affected
+    category's current_amount and daily rollup are recomputed set-wise.
+    With ?partial=true invalid rows are reported and the valid ones are still saved.
+    """
+    rows = request.data
+    if not isinstance(rows, list):
+        return Response({'detail': 'Expected a list of expenses.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(rows) > settings.EXPENSE_BULK_MAX_ROWS:
+        return Response(
+            {'detail': f'At most {settings.EXPENSE_BULK_MAX_ROWS} expenses can be created at once.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Resolve which of the referenced categories the user owns in one query
+    requested_ids = set()
+    for row in rows:
+        try:
+            requested_ids.add(int(row.get('category')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    category_ids = set(
+        Category.objects.filter(
+            id__in=requested_ids,
+            budget__in=Budget.objects.for_user(request.user),
+        ).values_list('id', flat=True)
+    )
+
+    skip_invalid = request.query_params.get('partial', '').lower() in ('1', 'true')
+    serializer = ExpenseSerializer(
+        data=rows,
+        many=True,
+        context={'category_ids': category_ids, 'skip_invalid': skip_invalid},
+    )
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        expenses = serializer.save()
+        affected = Category.objects.filter(id__in={expense.category_id for expense in expenses})
+        affected.recompute_current_amount()
+        if expenses:
+            dates = [expense.date for expense in expenses]
+            DailyCategorySpend.objects.rebuild(
+                {expense.category_id for expense in expenses}, min(dates), max(dates),
+            )
+        # bulk_create sends no post_save signals, so bump budget versions here
+        bump_versions(affected.values('budget_id'))
+
+    return Response({
+        'created': len(expenses),
+        'errors': getattr(serializer, 'row_errors', []),
+    }, status=status.HTTP_201_CREATED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_expenses(request, id):
+    """
+    Stream every expense in a budget as CSV (default) or NDJSON (?as=ndjson).
+    Rows are encoded as they are read, so memory use does not depend on the export size.
+    """
+    export_format = request.query_params.get('as', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'detail': 'Unsupported export format.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        budget = Budget.objects.for_user(request.user).get(pk=id)
+    except Budget.DoesNotExist:
+        return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    encode, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(encode(expense_rows(budget)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="budget-{budget.id}-expenses.{export_format}"'
+    return response
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rollover_budget(request, id):
+    """
+    Close a budget and start the next one with the same categories.
+    The old budget ends on 'end_date' (default: its current end date, or today)
+    and the new one starts the day after. Categories are copied with one
+    INSERT ... SELECT and every member of the old budget is added to the new one.
+    A budget can be rolled over only once.
+    """
+    serializer = RolloverSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        try:
+            # The row lock serialises concurrent rollovers of the same budget
+            budget = Budget.objects.for_user(request.user).select_for_update().annotate(
+                has_successor=Exists(Budget.objects.filter(rolled_over_from=OuterRef('pk'))),
+            ).get(pk=id)
+        except Budget.DoesNotExist:
+            return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if budget.has_successor:
+            return Response({'detail': 'Budget has already been rolled over.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        end_date = serializer.validated_data.get('end_date') or budget.end_date or timezone.localdate()
+        if end_date < budget.start_date:
+            return Response({'end_date': ['End date is before the budget start date.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        budget.end_date = end_date
+        budget.save(update_fields=['end_date', 'updated_at'])
+
+        new_budget = Budget.objects.create(
+            name=serializer.validated_data.get('name', budget.name),
+            start_date=end_date + timedelta(days=1),
+            rolled_over_from=budget,
+        )
+        member_ids = UserBudgetMap.objects.filter(budget=budget).values_list('user_id', flat=True)
+        UserBudgetMap.objects.bulk_create([UserBudgetMap(user_id=user_id, budget=new_budget) for user_id in member_ids])
+        Category.objects.filter(budget=budget).copy_to_budget(new_budget)
+        bump_versions([budget.id])
+
+    return Response(BudgetSerializer(new_budget).data, status=status.HTTP_201_CREATED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+@cached_budget_read
+def get_budget_analytics(request, id):
+    """
+    Get spending per category per day, week or month (?interval=, default month),
+    optionally between ?from= and ?to= (inclusive). Daily series cover at most
+    BUDGET_ANALYTICS_MAX_DAYS, by default the days up to the latest spending; page
+    back with to set to the day before the returned 'from'.
+    Grouping happens in the database and the response is cached per budget version.
+    """
+    interval = request.query_params.get('interval', 'month')
+    if interval not in INTERVALS:
+        return Response({'detail': 'Interval must be day, week or month.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start, end = (
+            date.fromisoformat(request.query_params[name]) if request.query_params.get(name) else None
+            for name in ('from', 'to')
+        )
+    except ValueError:
+        return Response({'detail': 'Dates must be YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        budget = Budget.objects.for_user(request.user).get(pk=id)
+    except Budget.DoesNotExist:
+        return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    if interval == 'day':
+        try:
+            start, end = day_window(budget, start, end)
+        except InvalidWindow:
+            return Response(
+                {'detail': f'A daily window must end on or after its start, span at most {settings.BUDGET_ANALYTICS_MAX_DAYS} days and stay within years 1 to 9999.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    elif start is not None and end is not None and start > end:
+        return Response({'detail': 'from must not be after to.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    if interval != 'day' or end is not None:
+        results = get_plan(SpendingSerializer).serialize(spending_by_period(budget, interval, start, end))
+
+    return Response({'interval': interval, 'from': start, 'to': end, 'results': results})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_budget_read
+def search_expenses_view(request):
+    """
+    Search the store and notes of the user's expenses (?q=, optionally ?budget=),
+    newest first, one page at a time. Every term must match as a word prefix.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'detail': 'A search query is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    expenses = Expense.objects.filter(category__budget__in=Budget.objects.for_user(request.user))
+    matches = search_expenses(expenses, query, (request.user.pk, get_version(request.user)[0]))
+
+    budget_id = request.query_params.get('budget')
+    if budget_id:
+        try:
+            budget_id = int(budget_id)
+            if not 0 < budget_id < 2 ** 63:
+                raise ValueError(budget_id)
+        except ValueError:
+            return Response({'detail': 'Invalid budget.'}, status=status.HTTP_400_BAD_REQUEST)
+        matches = matches.filter(category__budget_id=budget_id)
+
+    try:
+        page, next_cursor = paginate_expenses(matches, request.query_params)
+    except InvalidCursor:
+        return Response({'detail': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = ExpenseSerializer(page, many=True)
+
+    return Response({'results': serializer.data, 'next': next_cursor})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_budget_read
+def list_budget_members(request, id):
+    """
+    List the users sharing a budget, in the order they were added.
+    """
+    if not Budget.objects.for_user(request.user).filter(pk=id).exists():
+        return Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    members = UserBudgetMap.objects.filter(budget_id=id).order_by('date_added', 'id').values(
+        'user_id', 'user__username', 'date_added',
+    )
+    serializer = BudgetMemberSerializer(members, many=True)
+
     return Response(serializer.data)
 
+def get_membership_request(request, id):
+    """
+    Validate an add/remove members request. Returns (budget, usernames, error_response).
+    """
+    try:
+        budget = Budget.objects.for_user(request.user).get(pk=id)
+    except Budget.DoesNotExist:
+        return None, None, Response({'detail': 'Budget not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = MembershipSerializer(data=request.data)
+    if not serializer.is_valid():
+        return None, None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return budget, set(serializer.validated_data['usernames']), None
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def add_budget_members(request, id):
+    """
+    Share a budget with many users at once, given their usernames.
+    Users who are already members are skipped; unknown usernames are reported.
+    """
+    budget, usernames, error = get_membership_request(request, id)
+    if error is not None:
+        return error
+
+    # Resolve every username in one query
+    user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+
+    with transaction.atomic():
+        # The (user, budget) unique constraint turns existing links into no-ops
+        UserBudgetMap.objects.bulk_create(
+            [UserBudgetMap(user_id=user_id, budget=budget) for user_id in user_ids.values()],
+            ignore_conflicts=True,
+        )
+        bump_versions([budget.id])
+
+    return Response({
+        'members': sorted(user_ids),
+        'not_found': sorted(usernames - user_ids.keys()),
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def remove_budget_members(request, id):
+    """
+    Stop sharing a budget with many users at once, given their usernames.
+    The current user cannot remove themselves; delete the budget instead.
+    """
+    budget, usernames, error = get_membership_request(request, id)
+    if error is not None:
+        return error
+    if request.user.username in usernames:
+        return Response({'detail': 'You cannot remove yourself from a budget.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        # Bump first so the removed users' cached budget lists are invalidated too
+        bump_versions([budget.id])
+        user_ids = list(
+            UserBudgetMap.objects.filter(budget=budget, user__username__in=usernames).values_list('user_id', flat=True)
+        )
+        UserBudgetMap.objects.filter(budget=budget, user_id__in=user_ids).delete()
+        # The budget disappears for the removed users at their next sync
+        record_deletions(Tombstone.BUDGET, [budget.id], None, user_ids=user_ids)
+
+    return Response({'removed': len(user_ids)}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def get_budget_changes(request):
+    """
+    Get the budgets, categories and expenses changed or deleted since ?since=,
+    and the cursor to pass next time. Without a cursor, or with one older than the
+    tombstone retention, every row is returned with 'full' set, and the client
+    should replace its local copy. Each kind of row is limited to
+    BUDGET_SYNC_PAGE_SIZE per response; while 'has_more' is set, pass 'next'
+    back as ?since= to get the rest of the same sync.
+    """
+    since, started, positions = None, None, dict.fromkeys(CHANGE_STREAMS)
+    token = request.query_params.get('since')
+    if token:
+        try:
+            since, started, positions = decode_changes_cursor(token)
+        except InvalidCursor:
+            return Response({'detail': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+        if started is None and since < tombstone_horizon():
+            since = None
+    if started is None:
+        started = timezone.now()
+
+    budgets = Budget.objects.for_user(request.user)
+    categories = Category.objects.filter(budget__in=budgets)
+    expenses = Expense.objects.filter(category__budget__in=budgets)
+    tombstones = Tombstone.objects.none()
+
+    if since is not None:
+        # Budgets shared with the user since the cursor are sent in full
+        joined = list(
+            UserBudgetMap.objects.filter(user=request.user, date_added__gt=since).values_list('budget_id', flat=True)
+        )
+        budgets = budgets.filter(Q(updated_at__gt=since) | Q(id__in=joined)) if joined else budgets.filter(updated_at__gt=since)
+        categories = categories.filter(Q(updated_at__gt=since) | Q(budget_id__in=joined)) if joined else categories.filter(updated_at__gt=since)
+        expenses = expenses.filter(Q(updated_at__gt=since) | Q(category__budget_id__in=joined)) if joined else expenses.filter(updated_at__gt=since)
+        tombstones = Tombstone.objects.filter(user=request.user, deleted_at__gt=since)
+
+    streams = {
+        'budgets': (budgets, BudgetSerializer),
+        'categories': (categories, CategorySerializer),
+        'expenses': (expenses, ExpenseSerializer),
+    }
+    page_size = settings.BUDGET_SYNC_PAGE_SIZE
+    data = {'full': since is None}
+    remaining = {}
+    for name, (queryset, serializer_class) in streams.items():
+        rows = []
+        if name in positions:
+            plan = get_plan(serializer_class)
+            rows, remaining[name] = changes_page(
+                queryset.values(*plan.lookups, 'updated_at'), 'updated_at', positions[name], page_size,
+            )
+            rows = plan.serialize(rows)
+        data[name] = rows
+
+    deleted = {Tombstone.BUDGET: set(), Tombstone.CATEGORY: set(), Tombstone.EXPENSE: set()}
+    if 'deleted' in positions:
+        rows, remaining['deleted'] = changes_page(
+            tombstones.values('id', 'model', 'object_id', 'deleted_at'), 'deleted_at', positions['deleted'], page_size,
+        )
+        for row in rows:
+            deleted[row['model']].add(row['object_id'])
+    data['deleted'] = {
+        'budgets': sorted(deleted[Tombstone.BUDGET]),
+        'categories': sorted(deleted[Tombstone.CATEGORY]),
+        'expenses': sorted(deleted[Tombstone.EXPENSE]),
+    }
+
+    remaining = {name: position for name, position in remaining.items() if position is not None}
+    data['has_more'] = bool(remaining)
+    data['next'] = encode_continuation(since, started, remaining) if remaining else next_since(started)
+    return Response(data)
@@ -0,0 +1,91 @@
+# instrumentation.py
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+# Upper bounds of the histogram buckets for each recorded measurement
+BUCKETS = {
+    'request_duration_seconds': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'db_duration_seconds': (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    'db_queries': (0, 1, 2, 5, 10, 20, 50, 100),
+    'response_size_bytes': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+}
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram in the shape Prometheus expects.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        # First bucket whose upper bound is >= value; the last slot is +Inf
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper callable counting queries and the time spent in them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+# Histograms per URL name, for this process
+_histograms = defaultdict(lambda: {name: Histogram(buckets) for name, buckets in BUCKETS.items()})
+_lock = threading.Lock()
+
+
+def record_request(view, duration, db_queries, db_duration, response_size=None):
+    with _lock:
+        histograms = _histograms[view]
+        histograms['request_duration_seconds'].observe(duration)
+        histograms['db_queries'].observe(db_queries)
+        histograms['db_duration_seconds'].observe(db_duration)
+        if response_size is not None:
+            histograms['response_size_bytes'].observe(response_size)
+
+
+def render_prometheus():
+    """
+    Render every histogram in the Prometheus text format, labelled by view.
+    """
+    with _lock:
+        snapshot = {
+            view: {name: (h.buckets, list(h.counts), h.sum, h.count) for name, h in histograms.items()}
+            for view, histograms in _histograms.items()
+        }
+
+    lines = []
+    for name in BUCKETS:
+        metric = f'trackerjacker_{name}'
+        lines.append(f'# TYPE {metric} histogram')
+        for view in sorted(snapshot):
+            buckets, counts, total, count = snapshot[view][name]
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{view="{view}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{view="{view}"}} {total}')
+            lines.append(f'{metric}_count{{view="{view}"}} {count}')
+    return lines
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from backend.budget.versioning import bump_versions
+from backend.models import Category, DailyCategorySpend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyCategorySpend rollup from expenses in chunks of categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Categories rebuilt per batch.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        categories = 0
+        rows = 0
+        last_id = 0
+
+        while True:
+            # Walk categories by primary key; each chunk is rebuilt in its own transaction
+            chunk = list(
+                Category.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            categories += len(chunk)
+            rows += DailyCategorySpend.objects.rebuild(chunk)
+            # Analytics read the rollup, so cached responses and ETags must move on
+            bump_versions(Category.objects.filter(id__in=chunk).values('budget_id'))
+            self.stdout.write(f"Rebuilt {categories} categories ({rows} rollup rows)")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {rows} rollup rows for {categories} categories."))
@@ -0,0 +1,91 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from backend.models import Budget, Category, DailyCategorySpend, Expense, Tombstone, UserBudgetMap
+from backend.budget.analytics import spending_by_period
+from backend.budget.export import expense_queryset
+from backend.budget.pagination import DEFAULT_PAGE_SIZE, keyset_queryset
+
+# Tables that grow with usage; a full scan of any of them is a regression
+LARGE_TABLES = tuple(
+    model._meta.db_table for model in (Budget, Category, DailyCategorySpend, Expense, Tombstone, UserBudgetMap)
+)
+
+
+def endpoint_queries(user_id, budget_id):
+    """
+    The main queries behind each endpoint, keyed by URL name.
+    """
+    user_budgets = Budget.objects.for_user(user_id)
+    user_expenses = Expense.objects.filter(category__budget__in=user_budgets)
+    since = timezone.now()
+    today = timezone.localdate()
+    return {
+        'get_budget': user_budgets.filter(pk=budget_id),
+        'get_all_current_budgets': keyset_queryset(user_budgets.filter(end_date__isnull=True), {})[0],
+        'get_budget_summary': Category.objects.filter(budget_id=budget_id).with_expense_totals().order_by('name'),
+        'bulk_create_expenses': Category.objects.filter(id__in=[1, 2, 3], budget__in=user_budgets).values_list('id'),
+        'export_expenses': expense_queryset(budget_id),
+        'get_budget_analytics': spending_by_period(budget_id, 'day', today - timedelta(days=91), today),
+        'search_expenses': user_expenses.filter(id__in=[1, 2, 3]).order_by('-date', '-id')[:DEFAULT_PAGE_SIZE + 1],
+        'search_expenses_index': user_expenses.values_list('id', 'store', 'notes'),
+        'list_budget_members': UserBudgetMap.objects.filter(budget_id=budget_id).order_by('date_added', 'id'),
+        'add_budget_members': UserBudgetMap.objects.filter(budget_id=budget_id, user_id__in=[1, 2, 3]),
+        'rollover_budget': Category.objects.filter(budget_id=budget_id),
+        'rollover_budget_successor': Budget.objects.filter(rolled_over_from=budget_id),
+        'get_budget_changes': user_budgets.filter(updated_at__gt=since).order_by('updated_at', 'id'),
+        'get_budget_changes_categories': Category.objects.filter(
+            budget__in=user_budgets, updated_at__gt=since,
+        ).order_by('updated_at', 'id'),
+        'get_budget_changes_expenses': user_expenses.filter(updated_at__gt=since).order_by('updated_at', 'id'),
+        'get_budget_changes_tombstones': Tombstone.objects.filter(
+            user_id=user_id, deleted_at__gt=since,
+        ).order_by('deleted_at', 'id'),
+    }
+
+
+def find_full_scans(plan):
+    """
+    Return the large tables a query plan reads in full, whether from the table
+    or from an index. Only index lookups (SQLite SEARCH, MySQL ref/range/const
+    access) pass.
+    """
+    scanned = set()
+    if connection.vendor == 'sqlite':
+        # "SCAN <table>" reads every row, with or without "USING ... INDEX"
+        for table in re.findall(r'SCAN (\w+)\b', plan):
+            scanned.add(table)
+    elif connection.vendor == 'mysql':
+        # Tab separated rows: id, select_type, table, partitions, type, ...
+        for row in plan.splitlines():
+            columns = row.split('\t')
+            if len(columns) > 4 and columns[4] in ('ALL', 'index'):
+                scanned.add(columns[2])
+    return sorted(table for table in scanned if table in LARGE_TABLES)
+
+
+class Command(BaseCommand):
+    help = "Print the EXPLAIN plan of each endpoint's queries and flag full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=1, help='User id to build the queries for.')
+        parser.add_argument('--budget', type=int, default=1, help='Budget id to build the queries for.')
+        parser.add_argument('--check', action='store_true', help='Fail if any query does a full table scan.')
+
+    def handle(self, *args, **options):
+        regressions = []
+        for name, queryset in endpoint_queries(options['user'], options['budget']).items():
+            plan = queryset.explain()
+            scans = find_full_scans(plan)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if scans:
+                regressions.append(f"{name}: {', '.join(scans)}")
+                self.stdout.write(self.style.WARNING(f"Full scan of {', '.join(scans)}"))
+            self.stdout.write('')
+
+        if regressions and options['check']:
+            raise CommandError('Full table scans found:\n' + '\n'.join(regressions))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from backend.budget.sync import tombstone_horizon
+from backend.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete tombstones older than BUDGET_SYNC_TOMBSTONE_DAYS; older sync cursors get a full resync."
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=tombstone_horizon()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstones."))
@@ -0,0 +1,46 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from backend.budget.versioning import bump_versions
+from backend.models import Category
+
+
+class Command(BaseCommand):
+    help = "Recompute Category.current_amount from expenses in chunks and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Categories checked per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checked = 0
+        drifted = 0
+        last_id = 0
+
+        while True:
+            # Walk categories by primary key so each batch is an index range scan
+            chunk = list(
+                Category.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    expected=Category.objects.expected_current_amount()
+                ).values_list('id', 'current_amount', 'expected')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            checked += len(chunk)
+
+            stale = []
+            for category_id, current_amount, expected in chunk:
+                expected = expected.quantize(Decimal('0.01'))
+                if current_amount != expected:
+                    stale.append(category_id)
+                    self.stdout.write(f"Category {category_id}: stored {current_amount}, expected {expected}")
+
+            if stale and not options['dry_run']:
+                Category.objects.filter(id__in=stale).recompute_current_amount()
+                # Budget reads return current_amount, so their cached responses are stale
+                bump_versions(Category.objects.filter(id__in=stale).values('budget_id'))
+            drifted += len(stale)
+
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} categories, {action} {drifted} with drift."))
@@ -0,0 +1,65 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.db import connection
+from backend.instrumentation import QueryTimer, record_request
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, database query count and time, and response size for a
+    sample of requests, grouped by URL name. Sampled responses carry a
+    Server-Timing header; REQUEST_METRICS_SAMPLE_RATE sets the sampled fraction.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Stay on the event loop under ASGI so async views are not pushed to a thread
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = await self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    @staticmethod
+    def sampled():
+        sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+    @staticmethod
+    def record(request, response, timer, duration):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        record_request(view, duration, timer.count, timer.duration, size)
+
+        response['Server-Timing'] = (
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries", '
+            f'total;dur={duration * 1000:.1f}'
+        )
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_alter_budget_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['end_date', 'start_date', 'id'], name='budget_current_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_budget_current_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userbudgetmap',
+            index=models.Index(fields=['user', 'date_added'], name='userbudgetmap_user_added_idx'),
+        ),
+    ]
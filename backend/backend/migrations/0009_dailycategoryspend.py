@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_budget_updated_at_budgetversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCategorySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_cost', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_payback', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('expense_count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_spend', to='backend.category')),
+            ],
+            options={
+                'unique_together': {('category', 'date')},
+            },
+        ),
+    ]
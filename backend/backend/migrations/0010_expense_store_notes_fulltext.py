@@ -0,0 +1,29 @@
+from django.db import migrations
+
+INDEX = 'expense_store_notes_ft'
+
+
+def create_fulltext_index(apps, schema_editor):
+    # FULLTEXT indexes are MySQL only; other databases use the in-process fallback
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('backend', 'Expense')._meta.db_table)
+    schema_editor.execute(f'CREATE FULLTEXT INDEX {INDEX} ON {table} (store, notes)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('backend', 'Expense')._meta.db_table)
+    schema_editor.execute(f'DROP INDEX {INDEX} ON {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_dailycategoryspend'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_expense_store_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='rolled_over_from',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rolled_over_to', to='backend.budget'),
+        ),
+    ]
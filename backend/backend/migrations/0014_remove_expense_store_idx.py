@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:09
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_budget_rolled_over_from'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='expense_store_idx',
+        ),
+    ]
@@ -1,11 +1,93 @@
-from django.db import models
+from decimal import Decimal
+from django.conf import settings
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class BudgetQuerySet(models.QuerySet):
+    def for_user(self, user):
+        # Scope through the user's UserBudgetMap rows in a single join
+        return self.filter(userbudgetmap__user=user)
 
 
 class Budget(models.Model):
     name = models.CharField(max_length=100)
     start_date = models.DateField()
     end_date = models.DateField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # The budget this one was rolled over from; each budget rolls over at most once
+    rolled_over_from = models.OneToOneField(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='rolled_over_to',
+    )
+
+    objects = BudgetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Supports the keyset scan in get_all_current_budgets
+            models.Index(fields=['end_date', 'start_date', 'id'], name='budget_current_keyset_idx'),
+            # Range scan for the changes endpoint
+            models.Index(fields=['updated_at'], name='budget_updated_idx'),
+        ]
+
+class CategoryQuerySet(models.QuerySet):
+    @staticmethod
+    def expected_current_amount():
+        """
+        Expression for start_amount minus the net cost (cost - payback_amount)
+        of the category's expenses.
+        """
+        net_spent = Expense.objects.filter(category=OuterRef('pk')).values('category').annotate(
+            net=Sum(F('cost') - F('payback_amount'))
+        ).values('net')
+        return F('start_amount') - Coalesce(
+            Subquery(net_spent, output_field=models.DecimalField(max_digits=10, decimal_places=2)),
+            Value(Decimal('0.00')),
+        )
+
+    def with_expense_totals(self):
+        """
+        Annotate total_cost, total_payback and expense_count over each category's expenses.
+        """
+        zero = Value(Decimal('0.00'), output_field=models.DecimalField(max_digits=12, decimal_places=2))
+        return self.annotate(
+            total_cost=Coalesce(Sum('expenses__cost'), zero),
+            total_payback=Coalesce(Sum('expenses__payback_amount'), zero),
+            expense_count=Count('expenses'),
+        )
+
+    def recompute_current_amount(self):
+        # Recompute every category in the queryset with a single UPDATE
+        return self.update(current_amount=self.expected_current_amount(), updated_at=timezone.now())
+
+    def copy_to_budget(self, budget):
+        """
+        Copy these categories into budget with a single INSERT ... SELECT, each
+        starting again at its start_amount. Returns the number of rows copied.
+        """
+        select = self.order_by().annotate(
+            reset_amount=F('start_amount'),
+            target_budget=Value(budget.pk, output_field=models.BigIntegerField()),
+            copied_at=Value(timezone.now(), output_field=models.DateTimeField()),
+        ).values_list('name', 'start_amount', 'reset_amount', 'target_budget', 'copied_at')
+        select_sql, params = select.query.sql_with_params()
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        columns = ', '.join(
+            quote(column) for column in ('name', 'start_amount', 'current_amount', 'budget_id', 'updated_at')
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {quote(Category._meta.db_table)} ({columns}) {select_sql}', params)
+            return cursor.rowcount
+
+    def adjust_current_amount(self, amount):
+        # Atomic in-database adjustment, safe against concurrent writers
+        return self.update(current_amount=F('current_amount') + amount, updated_at=timezone.now())
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -13,9 +95,16 @@ class Category(models.Model):
     current_amount = models.DecimalField(max_digits=10, decimal_places=2)
 
     budget = models.ForeignKey(Budget, related_name='categories', on_delete=models.CASCADE)
+    # Queryset updates of current_amount set this explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         unique_together = ('name', 'budget')
+        indexes = [
+            models.Index(fields=['budget', 'updated_at'], name='category_budget_updated_idx'),
+        ]
 
 class Expense(models.Model):
     cost = models.DecimalField(max_digits=10, decimal_places=2)
@@ -25,6 +114,158 @@ class Expense(models.Model):
     notes = models.CharField(max_length=5000)
 
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='expenses')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Per-category date ranges: exports, analytics and rollups
+            models.Index(fields=['category', 'date'], name='expense_category_date_idx'),
+            models.Index(fields=['category', 'updated_at'], name='expense_category_updated_idx'),
+        ]
+
+    # Category.current_amount and the DailyCategorySpend rollup are kept in step
+    # with expenses on save() and delete() through atomic in-database deltas.
+    # Bulk operations bypass these and must call recompute_current_amount() and
+    # DailyCategorySpend.objects.rebuild().
+
+    @property
+    def net_cost(self):
+        return Decimal(self.cost) - Decimal(self.payback_amount)
+
+    def rollup_key(self):
+        # (category_id, date, cost, payback_amount) as counted in the derived data
+        return (self.category_id, self.date, Decimal(self.cost), Decimal(self.payback_amount))
+
+    def locked_rollup_key(self):
+        """
+        Lock the stored row and return its rollup_key(), or None when it does not
+        exist. Diffing against the locked row rather than the values this instance
+        was loaded with keeps concurrent edits of one expense from double counting.
+        """
+        return Expense.objects.select_for_update().filter(pk=self.pk).values_list(
+            'category_id', 'date', 'cost', 'payback_amount',
+        ).first()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = None if self._state.adding else self.locked_rollup_key()
+            super().save(*args, **kwargs)
+            current = self.rollup_key()
+            category_id, date, cost, payback = current
+            if stored is None:
+                Category.objects.filter(pk=category_id).adjust_current_amount(payback - cost)
+                DailyCategorySpend.objects.adjust(category_id, date, cost, payback, 1)
+            elif stored != current:
+                old_category_id, old_date, old_cost, old_payback = stored
+                if old_category_id != category_id:
+                    Category.objects.filter(pk=old_category_id).adjust_current_amount(old_cost - old_payback)
+                    Category.objects.filter(pk=category_id).adjust_current_amount(payback - cost)
+                elif old_cost - old_payback != cost - payback:
+                    Category.objects.filter(pk=category_id).adjust_current_amount(
+                        (old_cost - old_payback) - (cost - payback)
+                    )
+                DailyCategorySpend.objects.adjust(old_category_id, old_date, -old_cost, -old_payback, -1)
+                DailyCategorySpend.objects.adjust(category_id, date, cost, payback, 1)
+
+    def delete(self, *args, **kwargs):
+        # Imported here to avoid a circular import; see backend/signals.py for why
+        # deletes bump the budget version here rather than through post_delete
+        from backend.budget.sync import record_deletions
+        from backend.budget.versioning import bump_versions
+
+        pk = self.pk
+        with transaction.atomic():
+            stored = self.locked_rollup_key()
+            result = super().delete(*args, **kwargs)
+            if stored is None:
+                # Already deleted by a concurrent request, which did the bookkeeping
+                return result
+            category_id, date, cost, payback = stored
+            budget_ids = Category.objects.filter(pk=category_id).values('budget_id')
+            record_deletions(Tombstone.EXPENSE, [pk], budget_ids)
+            Category.objects.filter(pk=category_id).adjust_current_amount(cost - payback)
+            DailyCategorySpend.objects.adjust(category_id, date, -cost, -payback, -1)
+            bump_versions(budget_ids)
+        return result
+
+class DailyCategorySpendQuerySet(models.QuerySet):
+    def adjust(self, category_id, date, cost, payback, count):
+        """
+        Add deltas to one (category, date) row with an atomic in-database update,
+        creating the row when it does not exist yet and dropping it once it
+        counts no expenses. Safe against concurrent writers to the same day.
+        """
+        rows = self.filter(category_id=category_id, date=date)
+        deltas = {
+            'total_cost': F('total_cost') + cost,
+            'total_payback': F('total_payback') + payback,
+            'expense_count': F('expense_count') + count,
+        }
+        if count < 0:
+            # Only subtract from a row that counts the expenses being removed; a
+            # missing or drifted row (say before the backfill) is recomputed from
+            # Expense instead of going negative, which MySQL's UNSIGNED count rejects
+            if not rows.filter(expense_count__gte=-count).update(**deltas):
+                self.rebuild([category_id], date, date)
+            rows.filter(expense_count=0).delete()
+            return
+        if not rows.update(**deltas):
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(
+                        category_id=category_id, date=date,
+                        total_cost=cost, total_payback=payback, expense_count=count,
+                    )
+            except IntegrityError:
+                # Another transaction created the row first; add to it instead
+                rows.update(**deltas)
+
+    def rebuild(self, category_ids, start=None, end=None):
+        """
+        Recompute the rollup rows of the given categories from their expenses,
+        optionally only for dates between start and end (inclusive). Used by
+        backfills and bulk writes; single expense writes go through adjust().
+        Returns the number of rollup rows written.
+        """
+        expenses = Expense.objects.filter(category_id__in=category_ids)
+        rollups = self.filter(category_id__in=category_ids)
+        if start is not None:
+            expenses = expenses.filter(date__gte=start)
+            rollups = rollups.filter(date__gte=start)
+        if end is not None:
+            expenses = expenses.filter(date__lte=end)
+            rollups = rollups.filter(date__lte=end)
+
+        totals = expenses.values('category_id', 'date').annotate(
+            total_cost=Sum('cost'),
+            total_payback=Sum('payback_amount'),
+            expense_count=Count('id'),
+        ).order_by()
+        with transaction.atomic(using=self.db):
+            rollups.delete()
+            created = self.bulk_create(
+                [DailyCategorySpend(**row) for row in totals],
+                batch_size=settings.EXPENSE_BULK_BATCH_SIZE,
+            )
+        return len(created)
+
+
+class DailyCategorySpend(models.Model):
+    """
+    Per-category, per-day totals of expenses, so aggregates over long-lived
+    budgets read one row per day instead of one per expense.
+    """
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_spend')
+    date = models.DateField()
+    total_cost = models.DecimalField(max_digits=12, decimal_places=2)
+    total_payback = models.DecimalField(max_digits=12, decimal_places=2)
+    expense_count = models.PositiveIntegerField()
+
+    objects = DailyCategorySpendQuerySet.as_manager()
+
+    class Meta:
+        # unique_together also provides the (category, date) index
+        unique_together = ('category', 'date')
 
 class UserBudgetMap(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -32,5 +273,39 @@ class UserBudgetMap(models.Model):
     date_added = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # unique_together also provides the (user, budget) index
         unique_together = ('user', 'budget')
+        indexes = [
+            models.Index(fields=['user', 'date_added'], name='userbudgetmap_user_added_idx'),
+        ]
+
+
+class BudgetVersion(models.Model):
+    """
+    Per-user counter bumped whenever any of the user's budgets is written.
+    Drives the ETag/Last-Modified headers of the budget read endpoints.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='budget_version')
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
 
+class Tombstone(models.Model):
+    """
+    A row the changes endpoint should report as deleted to one user: a deleted
+    expense or budget, or a budget the user was removed from.
+    """
+    BUDGET = 'budget'
+    CATEGORY = 'category'
+    EXPENSE = 'expense'
+    MODEL_CHOICES = [(BUDGET, 'Budget'), (CATEGORY, 'Category'), (EXPENSE, 'Expense')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,14 +49,19 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'backend.authentication.caching.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Reverse proxies in front of Django. Throttles identify clients by
+    # REMOTE_ADDR when 0, otherwise by the X-Forwarded-For entry the outermost
+    # proxy appended, so clients cannot pick their own throttle key.
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', '0')),
 }
 
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +72,12 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
 ]
 
+# Compress responses in Django when it is reached directly rather than through
+# nginx, which compresses for the production profile. Placed right after the
+# metrics middleware so it sees the final response body.
+if os.environ.get('DJANGO_GZIP_RESPONSES', '') == '1':
+    MIDDLEWARE.insert(1, 'django.middleware.gzip.GZipMiddleware')
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:7001",
 ]
@@ -105,6 +117,158 @@ DATABASES = {
 }
 
 
+# Budget API
+# Rows per INSERT and the maximum rows accepted by the bulk expense endpoint
+
+EXPENSE_BULK_BATCH_SIZE = 500
+
+EXPENSE_BULK_MAX_ROWS = 10000
+
+# Rows fetched per database round trip when streaming an expense export
+
+EXPENSE_EXPORT_CHUNK_SIZE = 2000
+
+# Longest daily analytics series one request returns, and its default length
+
+BUDGET_ANALYTICS_MAX_DAYS = 92
+
+# Maximum usernames accepted by one add/remove budget members request
+
+BUDGET_MEMBERS_MAX_USERNAMES = 500
+
+# The changes endpoint's cursor trails the sync time by this many seconds, which
+# must cover the longest write transaction. Tombstones older than
+# BUDGET_SYNC_TOMBSTONE_DAYS may be pruned; older cursors get a full resync.
+
+BUDGET_SYNC_LAG_SECONDS = 5
+
+BUDGET_SYNC_TOMBSTONE_DAYS = 30
+
+# Maximum budgets, categories, expenses and tombstones in one changes response each
+
+BUDGET_SYNC_PAGE_SIZE = 1000
+
+
+# Bearer token Prometheus presents to /api/metrics/. When unset, only staff
+# sessions can read the metrics
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Fraction of requests timed by RequestMetricsMiddleware (0 turns it off)
+
+REQUEST_METRICS_SAMPLE_RATE = 1.0
+
+
+# Maximum number of sub-requests accepted by /api/batch/
+
+BATCH_MAX_REQUESTS = 20
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default; set REDIS_URL to share the cache between workers.
+
+# The 'responses' cache holds rendered budget responses; local memory evicts
+# least recently used entries beyond MAX_ENTRIES. With Redis, bound it with
+# maxmemory and an allkeys-lru policy instead.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+    CACHES['responses'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'KEY_PREFIX': 'responses',
+    }
+
+# Cache alias and lifetime (seconds) for token authentication lookups. Logout
+# and user changes only clear the cache they run against, so with several
+# workers set REDIS_URL; the short lifetime bounds staleness otherwise.
+
+AUTH_TOKEN_CACHE_ALIAS = 'default'
+
+AUTH_TOKEN_CACHE_TIMEOUT = 30
+
+# Cache alias and lifetime (seconds) for per-user budget versions. With the
+# local-memory cache and several workers, a worker can serve a version up to
+# this old, so keep it short unless the cache is shared.
+
+BUDGET_VERSION_CACHE_ALIAS = 'default'
+
+BUDGET_VERSION_CACHE_TIMEOUT = 30
+
+# Cache alias, lifetime (seconds) and size limit (bytes) for rendered budget responses
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+# Argon2 is preferred when argon2-cffi is installed; existing PBKDF2 hashes keep
+# working and are upgraded on the next login.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+try:
+    import argon2  # noqa: F401
+except ImportError:
+    pass
+else:
+    PASSWORD_HASHERS.insert(0, 'backend.authentication.hashers.TunedArgon2PasswordHasher')
+
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', '2'))
+
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', '65536'))  # KiB
+
+ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', '1'))
+
+# Threads verifying passwords off the request thread, and how many checks may
+# wait for one before logins are turned away with 503
+
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', '64'))
+
+
+# Login and registration throttling, per client IP and per username.
+# 'local' keeps token buckets in each process; 'cache' shares sliding windows
+# through AUTH_THROTTLE_CACHE_ALIAS (use with Redis when running several workers).
+
+AUTH_THROTTLE_BACKEND = os.environ.get('AUTH_THROTTLE_BACKEND', 'local')
+
+AUTH_THROTTLE_CACHE_ALIAS = 'default'
+
+AUTH_THROTTLE_RATES = {
+    'ip': '30/min',
+    'username': '10/min',
+}
+
+AUTH_THROTTLE_MAX_KEYS = 100000
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,37 @@
+"""
+Benchmark settings for backend project.
+
+Select with DJANGO_SETTINGS_MODULE=backend.settings_benchmark. Benchmarks run
+offline against SQLite by default; set BENCHMARK_DATABASE=mysql to use a local
+MySQL container configured through the same DB_* variables as
+backend.settings_production. Everything else comes from backend.settings.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+if os.environ.get('BENCHMARK_DATABASE', 'sqlite') == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.environ.get('DB_NAME', 'tracker_jacker'),
+            'USER': os.environ.get('DB_USER', 'root'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', 'dbroot'),
+            'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('DB_PORT', '7003'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'benchmark.sqlite3',
+        }
+    }
+
+# Workloads replay many logins from a single client address
+AUTH_THROTTLE_RATES = {
+    'ip': '1000000/min',
+    'username': '1000000/min',
+}
@@ -0,0 +1,36 @@
+"""
+Production settings for backend project.
+
+Select with DJANGO_SETTINGS_MODULE=backend.settings_production. Everything not
+overridden here comes from backend.settings.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = ALLOWED_HOSTS + [
+    host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host
+]
+
+# Database
+# Keep connections open between requests instead of reconnecting every time.
+# Set DB_CONN_MAX_AGE=0 when serving through ASGI workers, where Django
+# cannot reuse connections across requests.
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.environ.get('DB_NAME', 'tracker_jacker'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'dbroot'),
+        'HOST': os.environ.get('DB_HOST', 'db'),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
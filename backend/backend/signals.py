@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from backend.models import Category, Expense
+from backend.budget.versioning import bump_versions
+
+# Writes to categories and expenses change what the budget read endpoints return,
+# so they bump the budget version of every member of the budget. That moves the
+# ETag and the response cache key on.
+#
+# Deletes are deliberately not hooked with post_delete: any receiver makes Django
+# load every row of a cascading budget delete instead of deleting in bulk.
+# delete_budget and Expense.delete() bump the version themselves.
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    bump_versions([instance.budget_id])
+
+
+@receiver(post_save, sender=Expense)
+def expense_saved(sender, instance, **kwargs):
+    bump_versions(Category.objects.filter(pk=instance.category_id).values('budget_id'))
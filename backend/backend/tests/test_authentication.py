@@ -2,6 +2,10 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
+from django.test import override_settings
+from backend.authentication.caching import token_cache, token_cache_key, token_from_cache
+from backend.authentication.throttling import local_store
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
 
 class UserAuthTests(APITestCase):
 
@@ -34,6 +38,8 @@ class UserAuthTests(APITestCase):
 
     # Login Tests
     def setUp(self):
+        # Start every test with empty login/registration throttles
+        local_store.clear()
         self.user = User.objects.create_user(
             username='testuser1',
             password=self.password,
@@ -60,6 +66,57 @@ class UserAuthTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data['error'], 'Invalid credentials')
 
+    def test_login_single_query(self):
+        data = {
+            'username': 'testuser1',
+            'password': self.password,
+        }
+        # The user and their existing token come back in one query
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token'], self.token.key)
+
+    def test_login_creates_missing_token(self):
+        self.token.delete()
+        data = {
+            'username': 'testuser1',
+            'password': self.password,
+        }
+        response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token'], Token.objects.get(user=self.user).key)
+
+    def test_login_unknown_user(self):
+        data = {
+            'username': 'nosuchuser',
+            'password': self.password,
+        }
+        response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_upgrades_password_hash(self):
+        self.user.password = make_password(self.password, hasher='pbkdf2_sha256')
+        self.user.save(update_fields=['password'])
+        data = {
+            'username': 'testuser1',
+            'password': self.password,
+        }
+        response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The stored hash now uses the preferred hasher
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, get_hasher().algorithm)
+
+    @override_settings(PASSWORD_HASH_QUEUE_LIMIT=0)
+    def test_login_hashing_pool_full(self):
+        data = {
+            'username': 'testuser1',
+            'password': self.password,
+        }
+        response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
     # User Details Tests
     def test_user_details(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key) 
@@ -131,6 +188,63 @@ class UserAuthTests(APITestCase):
         response = self.client.put('/api/auth/update/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    # Async User Details Tests
+    def test_async_user_details(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = self.client.get('/api/auth/async/user/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['username'], 'testuser1')
+
+    def test_async_user_details_not_authenticated(self):
+        response = self.client.get('/api/auth/async/user/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Cached Token Authentication Tests
+    def test_warm_token_needs_no_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get('/api/auth/user/', format='json')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/user/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'testuser1')
+
+    def test_logout_invalidates_cached_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get('/api/auth/user/', format='json')
+        response = self.client.post('/api/auth/logout/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get('/api/auth/user/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_user_invalidates_cached_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get('/api/auth/user/', format='json')
+        self.client.put('/api/auth/update/', {'username': 'renameduser'}, format='json')
+        response = self.client.get('/api/auth/user/', format='json')
+        self.assertEqual(response.data['username'], 'renameduser')
+
+    def test_delete_user_invalidates_cached_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get('/api/auth/user/', format='json')
+        response = self.client.delete('/api/auth/delete/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get('/api/auth/user/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user = None
+
+    def test_cached_token_leaves_out_password(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get('/api/auth/user/', format='json')
+        cached = token_cache().get(token_cache_key(self.token.key))
+        self.assertNotIn(User.objects.get(pk=self.user.pk).password, cached)
+
+        # A user rebuilt from the cache keeps its password when saved
+        user, token = token_from_cache(self.token.key, cached)
+        self.assertEqual(token.key, self.token.key)
+        user.first_name = 'Changed'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password(self.password))
+
     def tearDown(self):
         # Delete the user and any associated tokens after the test
         if hasattr(self, 'user') and self.user:
@@ -0,0 +1,96 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from backend.models import Budget, UserBudgetMap
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from unittest import mock
+
+class BatchTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.budget = Budget.objects.create(name='Test Budget', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=self.user, budget=self.budget)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    # Test running several reads in one request
+    def test_batch_success(self):
+        data = {'requests': [
+            {'path': '/api/auth/user/'},
+            {'path': f'/api/budget/get/{self.budget.id}/'},
+            {'path': '/api/budget/get_all_current/?page_size=1'},
+            {'path': '/api/budget/get/9999/'},
+            {'path': '/api/auth/async/user/'},
+        ]}
+        response = self.client.post('/api/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        responses = response.data['responses']
+        self.assertEqual([item['status'] for item in responses], [200, 200, 200, 404, 200])
+        self.assertEqual(responses[0]['body']['username'], 'testuser')
+        self.assertEqual(responses[1]['body']['name'], 'Test Budget')
+        self.assertEqual(len(responses[2]['body']['results']), 1)
+        self.assertEqual(responses[3]['body']['detail'], 'Budget not found.')
+        self.assertEqual(responses[4]['body']['username'], 'testuser')
+
+    # Test that the batch authenticates once for all sub-requests
+    def test_batch_authenticates_once(self):
+        data = {'requests': [{'path': '/api/auth/user/'}] * 5}
+        # Only the token lookup of the batch request itself
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/batch/', data, format='json')
+        self.assertEqual([item['status'] for item in response.data['responses']], [200] * 5)
+
+    # Test paths that cannot be batched
+    def test_batch_invalid_paths(self):
+        data = {'requests': [
+            {'path': '/admin/'},
+            {'path': '/api/does-not-exist/'},
+            {'path': f'/api/budget/export/{self.budget.id}/'},
+        ]}
+        response = self.client.post('/api/batch/', data, format='json')
+        self.assertEqual([item['status'] for item in response.data['responses']], [400, 404, 400])
+
+    # Test the request format and the cap on sub-requests
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_bad_request(self):
+        response = self.client.post('/api/batch/', {'requests': 'nope'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data = {'requests': [{'path': '/api/auth/user/'}] * 3}
+        response = self.client.post('/api/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'At most 2 requests can be batched.')
+
+    # Test that batching requires authentication
+    def test_batch_not_authenticated(self):
+        self.client.credentials()
+        response = self.client.post('/api/batch/', {'requests': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Test that plain Django views see the user and failures stay per item
+    @override_settings(METRICS_TOKEN='')
+    def test_batch_plain_view_and_failure(self):
+        data = {'requests': [{'path': '/api/metrics/'}, {'path': '/api/auth/user/'}, {'path': '/api/health/'}]}
+        with mock.patch('backend.authentication.views.UserSerializer', side_effect=RuntimeError), \
+                self.assertLogs('backend.views.batch', 'ERROR'):
+            response = self.client.post('/api/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        responses = response.data['responses']
+        # A regular user may not read metrics
+        self.assertEqual([item['status'] for item in responses], [401, 500, 200])
+        self.assertEqual(responses[1]['body'], {'detail': 'Internal server error.'})
+
+        self.user.is_staff = True
+        self.user.save()
+        caches['default'].clear()
+        response = self.client.post('/api/batch/', {'requests': [{'path': '/api/metrics/'}]}, format='json')
+        self.assertEqual(response.data['responses'][0]['status'], 200)
@@ -1,14 +1,25 @@
-from django.test import TestCase
+from django.test import Client, TestCase, override_settings
 from rest_framework import status
-from backend.models import Budget
+from backend.models import Budget, Category, Expense, UserBudgetMap
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
-from datetime import date
+from datetime import date, timedelta
+from django.utils import timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.cache import caches
+from backend.management.commands.explain_queries import find_full_scans
+from backend.budget.pagination import encode_cursor
+from backend.budget.sync import encode_continuation
 
 class BudgetTests(TestCase):
 
     def setUp(self):
+        # Cached budget versions and responses are keyed by user id, which tests reuse
+        for cache in caches.all():
+            cache.clear()
+
         # Create a user for authentication
         self.user = User.objects.create_user(username='testuser', password='testpassword')
         
@@ -19,6 +30,12 @@ class BudgetTests(TestCase):
         self.client = APIClient()
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
 
+    def create_budget(self, user=None, **fields):
+        # Create a budget and link it to the user through UserBudgetMap
+        budget = Budget.objects.create(**fields)
+        UserBudgetMap.objects.create(user=user or self.user, budget=budget)
+        return budget
+
     # Test creating a budget
     def test_create_budget_success(self):
         data = {
@@ -31,6 +48,8 @@ class BudgetTests(TestCase):
         self.assertEqual(response.data['name'], 'Test Budget')
         self.assertEqual(response.data['start_date'], '2025-01-01')
         self.assertEqual(response.data['end_date'], '2025-12-31')
+        # The new budget is owned by the creating user
+        self.assertTrue(UserBudgetMap.objects.filter(user=self.user, budget_id=response.data['id']).exists())
 
     # Test creating a budget without a name (bad request)
     def test_create_budget_missing_name(self):
@@ -45,7 +64,7 @@ class BudgetTests(TestCase):
     # Test updating a budget
     def test_update_budget_success(self):
         # First, create a budget
-        budget = Budget.objects.create(
+        budget = self.create_budget(
             name='Test Budget',
             start_date='2025-01-01',
             end_date='2025-12-31',
@@ -75,7 +94,7 @@ class BudgetTests(TestCase):
     # Test getting a budget
     def test_get_budget_success(self):
         # First, create a budget
-        budget = Budget.objects.create(
+        budget = self.create_budget(
             name='Test Budget',
             start_date='2025-01-01',
             end_date='2025-12-31',
@@ -93,7 +112,7 @@ class BudgetTests(TestCase):
     # Test deleting a budget
     def test_delete_budget_success(self):
         # First, create a budget
-        budget = Budget.objects.create(
+        budget = self.create_budget(
             name='Test Budget',
             start_date='2025-01-01',
             end_date='2025-12-31',
@@ -113,12 +132,12 @@ class BudgetTests(TestCase):
     # Test getting all current budgets
     def test_get_all_current_budgets(self):
         # Create some budgets
-        budget1 = Budget.objects.create(
+        budget1 = self.create_budget(
             name='Test Budget 1',
             start_date='2025-01-01',
             end_date=None,  # Ongoing budget
         )
-        budget2 = Budget.objects.create(
+        budget2 = self.create_budget(
             name='Test Budget 2',
             start_date='2025-01-01',
             end_date='2025-12-31',
@@ -126,13 +145,14 @@ class BudgetTests(TestCase):
 
         response = self.client.get('/api/budget/get_all_current/', format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Only 1 ongoing budget (budget1)
-        self.assertEqual(response.data[0]['name'], 'Test Budget 1')
+        self.assertEqual(len(response.data['results']), 1)  # Only 1 ongoing budget (budget1)
+        self.assertEqual(response.data['results'][0]['name'], 'Test Budget 1')
+        self.assertIsNone(response.data['next'])
 
     # Test getting all current budgets when there are no ongoing budgets
     def test_get_all_current_budgets_empty(self):
         # Create a budget with an end date
-        Budget.objects.create(
+        self.create_budget(
             name='Completed Budget',
             start_date='2020-01-01',
             end_date='2020-12-31',
@@ -140,7 +160,584 @@ class BudgetTests(TestCase):
 
         response = self.client.get('/api/budget/get_all_current/', format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)  # No ongoing budgets
+        self.assertEqual(len(response.data['results']), 0)  # No ongoing budgets
+
+    # Test paging through current budgets with the next cursor
+    def test_get_all_current_budgets_pagination(self):
+        # Several budgets share a start date so the cursor has to break ties on id
+        for i in range(5):
+            self.create_budget(
+                name=f'Budget {i}',
+                start_date='2025-01-01' if i < 3 else '2025-02-01',
+                end_date=None,
+            )
+
+        names = []
+        cursor = None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/api/budget/get_all_current/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            names += [budget['name'] for budget in response.data['results']]
+            cursor = response.data['next']
+            if cursor is None:
+                break
+
+        self.assertEqual(names, [f'Budget {i}' for i in range(5)])
+
+    # Test that a malformed cursor is rejected
+    def test_get_all_current_budgets_invalid_cursor(self):
+        response = self.client.get('/api/budget/get_all_current/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Invalid cursor.')
+
+        # Ids the database cannot hold are rejected before they reach it
+        for pk in (2 ** 63, 10 ** 30, 0):
+            cursor = encode_cursor(date(2025, 1, 1), pk)
+            response = self.client.get('/api/budget/get_all_current/', {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that another user's budgets are invisible
+    def test_budgets_scoped_to_user(self):
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        budget = self.create_budget(
+            user=other,
+            name='Other Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+
+        response = self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/budget/get_all_current/', format='json')
+        self.assertEqual(len(response.data['results']), 0)
+
+        response = self.client.delete(f'/api/budget/delete/{budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Budget.objects.filter(id=budget.id).exists())
+
+    # Test that a budget read is a single joined query, and free once cached
+    def test_get_budget_single_query(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        with self.assertNumQueries(1):
+            Budget.objects.for_user(self.user).get(pk=budget.id)
+
+        # Warm the token, budget version and response caches first
+        self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['name'], 'Test Budget')
+
+    # Test the budget summary totals and that its query count is constant
+    def test_get_budget_summary(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        for i in range(3):
+            category = Category.objects.create(
+                name=f'Category {i}',
+                start_amount='100.00',
+                current_amount='100.00',
+                budget=budget,
+            )
+            for j in range(i):
+                Expense.objects.create(
+                    cost='10.50',
+                    store='Store',
+                    payback_amount='1.25',
+                    date='2025-01-02',
+                    notes='',
+                    category=category,
+                )
+
+        # Warm the token and budget version caches, then drop the cached response
+        self.client.get(f'/api/budget/summary/{budget.id}/', format='json')
+        caches['responses'].clear()
+
+        # The scoped budget and one prefetch for all categories
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/budget/summary/{budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        categories = response.data['categories']
+        self.assertEqual([c['name'] for c in categories], ['Category 0', 'Category 1', 'Category 2'])
+        self.assertEqual(categories[0]['expense_count'], 0)
+        self.assertEqual(categories[0]['total_cost'], '0.00')
+        self.assertEqual(categories[2]['expense_count'], 2)
+        self.assertEqual(categories[2]['total_cost'], '21.00')
+        self.assertEqual(categories[2]['total_payback'], '2.50')
+        self.assertEqual(categories[2]['start_amount'], '100.00')
+
+    # Test the summary of a budget the user does not own
+    def test_get_budget_summary_not_found(self):
+        response = self.client.get('/api/budget/summary/9999/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['detail'], 'Budget not found.')
+
+    # Test that the async read endpoints match the sync ones
+    def test_async_budget_reads(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        sync_response = self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+        async_response = self.client.get(f'/api/budget/async/get/{budget.id}/')
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+        sync_response = self.client.get('/api/budget/get_all_current/', format='json')
+        async_response = self.client.get('/api/budget/async/get_all_current/')
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+        response = self.client.get('/api/budget/async/get/9999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.credentials()
+        response = self.client.get(f'/api/budget/async/get/{budget.id}/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Test that no endpoint query falls back to a full table scan
+    def test_endpoint_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', '--check', '--user', str(self.user.id), stdout=out)
+        self.assertIn('get_all_current_budgets', out.getvalue())
+        self.assertIn('get_budget_analytics', out.getvalue())
+
+    # Test that full table and full index scans are reported and index lookups pass
+    def test_find_full_scans(self):
+        self.assertEqual(find_full_scans('SCAN backend_expense'), ['backend_expense'])
+        self.assertEqual(find_full_scans('SCAN backend_expense USING INDEX expense_category_date_idx'), ['backend_expense'])
+        self.assertEqual(find_full_scans('SCAN backend_dailycategoryspend USING COVERING INDEX x'), ['backend_dailycategoryspend'])
+        self.assertEqual(find_full_scans('SCAN backend_expense_archive'), [])
+        self.assertEqual(find_full_scans('SEARCH backend_expense USING INDEX expense_category_date_idx (category_id=?)'), [])
+
+    # Test conditional GET with ETag on the budget reads
+    def test_get_budget_conditional(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        for url in (f'/api/budget/get/{budget.id}/', '/api/budget/get_all_current/'):
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+            self.assertIn('Last-Modified', response)
+
+            # Warm token and cached version: no queries at all
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A write bumps the version, so the old ETag no longer matches
+        data = {
+            'id': budget.id,
+            'name': 'Updated Budget',
+            'start_date': '2025-01-01',
+        }
+        self.client.post('/api/budget/update/', data, format='json')
+        response = self.client.get(f'/api/budget/get/{budget.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Updated Budget')
+        self.assertNotEqual(response['ETag'], etag)
+
+    # Test that category and expense writes invalidate cached reads
+    def test_budget_cache_invalidated_by_expense_write(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        category = Category.objects.create(
+            name='Groceries', start_amount='100.00', current_amount='100.00', budget=budget,
+        )
+        url = f'/api/budget/summary/{budget.id}/'
+        first = self.client.get(url, format='json')
+        self.assertEqual(self.client.get(url, format='json')['ETag'], first['ETag'])
+
+        expense = Expense.objects.create(
+            cost='10.00', store='Store', payback_amount='0.00', date='2025-01-02', notes='', category=category,
+        )
+        response = self.client.get(url, format='json')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.json()['categories'][0]['total_cost'], '10.00')
+
+        expense.delete()
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.json()['categories'][0]['expense_count'], 0)
+
+    # Test that cache hits and misses are exposed as metrics
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_response_cache_metrics(self):
+        budget = self.create_budget(
+            name='Test Budget',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+        self.client.get(f'/api/budget/get/{budget.id}/', format='json')
+
+        response = Client().get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('trackerjacker_response_cache_requests_total{outcome="hit"}', response.content.decode())
+
+    # Test rolling a budget over into a new one with the same categories
+    def test_rollover_budget(self):
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        budget = self.create_budget(
+            name='January',
+            start_date='2025-01-01',
+            end_date=None,
+        )
+        UserBudgetMap.objects.create(user=other, budget=budget)
+        for i in range(50):
+            Category.objects.create(
+                name=f'Category {i}', start_amount=f'{i}.00', current_amount='0.00', budget=budget,
+            )
+
+        response = self.client.post(
+            f'/api/budget/rollover/{budget.id}/',
+            {'name': 'February', 'end_date': '2025-01-31'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['name'], 'February')
+        self.assertEqual(response.data['start_date'], '2025-02-01')
+        self.assertIsNone(response.data['end_date'])
+
+        budget.refresh_from_db()
+        self.assertEqual(str(budget.end_date), '2025-01-31')
+
+        new_budget = Budget.objects.get(pk=response.data['id'])
+        categories = new_budget.categories.order_by('id')
+        self.assertEqual(categories.count(), 50)
+        self.assertEqual(str(categories[7].start_amount), '7.00')
+        # Copied categories start again at their start amount
+        self.assertEqual(categories[7].current_amount, categories[7].start_amount)
+        self.assertEqual(
+            set(UserBudgetMap.objects.filter(budget=new_budget).values_list('user_id', flat=True)),
+            {self.user.id, other.id},
+        )
+
+    # Test that rollover cost does not depend on the number of categories
+    def test_rollover_budget_query_count(self):
+        budget = self.create_budget(name='January', start_date='2025-01-01', end_date=None)
+        Category.objects.bulk_create([
+            Category(name=f'Category {i}', start_amount='1.00', current_amount='1.00', budget=budget)
+            for i in range(200)
+        ])
+        self.client.get('/api/auth/user/')  # warm the token cache
+        # Savepoint, lock, close, create, members, maps, copy, bump (2), release
+        with self.assertNumQueries(10):
+            response = self.client.post(f'/api/budget/rollover/{budget.id}/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Category.objects.filter(budget_id=response.data['id']).count(), 200)
+
+    # Test rollover validation
+    def test_rollover_budget_errors(self):
+        budget = self.create_budget(name='January', start_date='2025-01-01', end_date=None)
+        response = self.client.post(f'/api/budget/rollover/{budget.id}/', {'end_date': '2024-12-31'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('end_date', response.data)
+
+        response = self.client.post('/api/budget/rollover/9999/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that a budget rolls over only once
+    def test_rollover_budget_once(self):
+        budget = self.create_budget(name='January', start_date='2025-01-01', end_date=None)
+        url = f'/api/budget/rollover/{budget.id}/'
+        response = self.client.post(url, {'end_date': '2099-01-31'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Budget.objects.get(pk=response.data['id']).rolled_over_from_id, budget.id)
+
+        # Repeating the call, even before the end date, creates no second successor
+        response = self.client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Budget has already been rolled over.')
+        self.assertEqual(Budget.objects.filter(rolled_over_from=budget).count(), 1)
+
+        # A budget whose end date has passed rolls over from that date
+        ended = self.create_budget(name='September', start_date='2026-09-01', end_date='2026-09-30')
+        response = self.client.post(f'/api/budget/rollover/{ended.id}/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['start_date'], '2026-10-01')
+
+    # Test adding, listing and removing budget members in bulk
+    def test_budget_members(self):
+        budget = self.create_budget(name='Household', start_date='2025-01-01', end_date=None)
+        alice = User.objects.create_user(username='alice', password='testpassword')
+        User.objects.create_user(username='bob', password='testpassword')
+
+        # Token, budget, username lookup, savepoint, insert, budget members, version bump, release
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                f'/api/budget/{budget.id}/members/add/',
+                {'usernames': ['alice', 'bob', 'testuser', 'nobody']},
+                format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'members': ['alice', 'bob', 'testuser'], 'not_found': ['nobody']})
+
+        # Existing members are skipped
+        response = self.client.post(f'/api/budget/{budget.id}/members/add/', {'usernames': ['alice']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(UserBudgetMap.objects.filter(budget=budget).count(), 3)
+
+        response = self.client.get(f'/api/budget/{budget.id}/members/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([member['username'] for member in response.json()], ['testuser', 'alice', 'bob'])
+
+        # New members see the budget
+        alice_client = APIClient()
+        alice_client.force_authenticate(alice)
+        response = alice_client.get(f'/api/budget/get/{budget.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # A renamed member shows up under the new name in the cached list
+        response = alice_client.put('/api/auth/update/', {'username': 'alicia'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f'/api/budget/{budget.id}/members/')
+        self.assertEqual([member['username'] for member in response.json()], ['testuser', 'alicia', 'bob'])
+
+        # A deleted member drops out of the cached list
+        bob = User.objects.get(username='bob')
+        bob_client = APIClient()
+        bob_client.force_authenticate(bob)
+        etag = self.client.get(f'/api/budget/{budget.id}/members/')['ETag']
+        response = bob_client.delete('/api/auth/delete/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(f'/api/budget/{budget.id}/members/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual([member['username'] for member in response.json()], ['testuser', 'alicia'])
+
+        response = self.client.post(
+            f'/api/budget/{budget.id}/members/remove/', {'usernames': ['alicia', 'bob', 'nobody']}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(list(UserBudgetMap.objects.filter(budget=budget).values_list('user__username', flat=True)), ['testuser'])
+        response = alice_client.get(f'/api/budget/get/{budget.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test budget member requests that are rejected
+    def test_budget_members_errors(self):
+        budget = self.create_budget(name='Household', start_date='2025-01-01', end_date=None)
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        other_budget = self.create_budget(user=other, name='Other', start_date='2025-01-01', end_date=None)
+
+        response = self.client.post(f'/api/budget/{other_budget.id}/members/add/', {'usernames': ['testuser']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f'/api/budget/{other_budget.id}/members/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(f'/api/budget/{budget.id}/members/add/', {'usernames': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('usernames', response.data)
+
+        response = self.client.post(f'/api/budget/{budget.id}/members/remove/', {'usernames': ['testuser']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test syncing budget changes incrementally from a cursor
+    def test_get_budget_changes(self):
+        budget = self.create_budget(name='Household', start_date='2025-01-01', end_date=None)
+        category = Category.objects.create(name='Food', start_amount='100.00', current_amount='100.00', budget=budget)
+        expense = Expense.objects.create(cost='10.00', store='Store', payback_amount='0.00', date='2025-01-02', notes='', category=category)
+
+        # The first sync returns everything
+        response = self.client.get('/api/budget/changes/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertTrue(data['full'])
+        self.assertEqual([row['id'] for row in data['budgets']], [budget.id])
+        self.assertEqual(data['categories'], [{
+            'id': category.id, 'name': 'Food', 'start_amount': '100.00', 'current_amount': '90.00', 'budget': budget.id,
+        }])
+        self.assertEqual([row['id'] for row in data['expenses']], [expense.id])
+
+        # Move every row behind the cursor, then change one expense
+        since = data['next']
+        earlier = timezone.now() - timedelta(minutes=1)
+        Budget.objects.update(updated_at=earlier)
+        Category.objects.update(updated_at=earlier)
+        Expense.objects.update(updated_at=earlier)
+        UserBudgetMap.objects.update(date_added=earlier)
+        other = Expense.objects.create(cost='5.00', store='Other', payback_amount='0.00', date='2025-01-03', notes='', category=category)
+        Expense.objects.get(pk=expense.pk).delete()
+
+        data = self.client.get('/api/budget/changes/', {'since': since}).json()
+        self.assertFalse(data['full'])
+        self.assertEqual(data['budgets'], [])
+        # current_amount moved, so the category is sent again
+        self.assertEqual([row['current_amount'] for row in data['categories']], ['95.00'])
+        self.assertEqual([row['id'] for row in data['expenses']], [other.id])
+        self.assertEqual(data['deleted'], {'budgets': [], 'categories': [], 'expenses': [expense.id]})
+
+        response = self.client.get('/api/budget/changes/', {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Continuation cursors with ids the database cannot hold are rejected
+        cursor = encode_continuation(None, timezone.now(), {'expenses': (timezone.now(), 2 ** 63)})
+        response = self.client.get('/api/budget/changes/', {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that large syncs are split into pages that together hold every row once
+    @override_settings(BUDGET_SYNC_PAGE_SIZE=2)
+    def test_get_budget_changes_pages(self):
+        budget = self.create_budget(name='Household', start_date='2025-01-01', end_date=None)
+        category = Category.objects.create(name='Food', start_amount='100.00', current_amount='100.00', budget=budget)
+        expenses = [
+            Expense.objects.create(cost='1.00', store='Store', payback_amount='0.00', date='2025-01-02', notes='', category=category)
+            for _ in range(5)
+        ]
+        # Rows sharing one updated_at are split on id
+        Expense.objects.update(updated_at=timezone.now())
+
+        pages = []
+        data = self.client.get('/api/budget/changes/').json()
+        pages.append(data)
+        while data['has_more']:
+            data = self.client.get('/api/budget/changes/', {'since': data['next']}).json()
+            pages.append(data)
+
+        self.assertEqual(len(pages), 3)
+        self.assertTrue(all(page['full'] for page in pages))
+        self.assertTrue(all(len(page['expenses']) <= 2 for page in pages))
+        self.assertEqual(
+            [row['id'] for page in pages for row in page['expenses']], [expense.id for expense in expenses],
+        )
+        self.assertEqual([row['id'] for page in pages for row in page['budgets']], [budget.id])
+
+        # The last page's cursor starts an incremental sync
+        Expense.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        Category.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        Budget.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        UserBudgetMap.objects.update(date_added=timezone.now() - timedelta(minutes=1))
+        data = self.client.get('/api/budget/changes/', {'since': data['next']}).json()
+        self.assertFalse(data['full'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['expenses'], [])
+
+    # Test that sharing, unsharing and deleting budgets reach other members' syncs
+    def test_get_budget_changes_membership(self):
+        alice = User.objects.create_user(username='alice', password='testpassword')
+        alice_client = APIClient()
+        alice_client.force_authenticate(alice)
+        since = alice_client.get('/api/budget/changes/').json()['next']
+
+        budget = Budget.objects.create(name='Household', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=self.user, budget=budget)
+        Category.objects.create(name='Food', start_amount='100.00', current_amount='100.00', budget=budget)
+        earlier = timezone.now() - timedelta(minutes=1)
+        Budget.objects.update(updated_at=earlier)
+        Category.objects.update(updated_at=earlier)
+
+        # A newly shared budget is sent in full despite its old rows
+        self.client.post(f'/api/budget/{budget.id}/members/add/', {'usernames': ['alice']}, format='json')
+        data = alice_client.get('/api/budget/changes/', {'since': since}).json()
+        self.assertEqual([row['id'] for row in data['budgets']], [budget.id])
+        self.assertEqual(len(data['categories']), 1)
+
+        self.client.post(f'/api/budget/{budget.id}/members/remove/', {'usernames': ['alice']}, format='json')
+        data = alice_client.get('/api/budget/changes/', {'since': since}).json()
+        self.assertEqual(data['budgets'], [])
+        self.assertEqual(data['deleted']['budgets'], [budget.id])
+
+        since = self.client.get('/api/budget/changes/').json()['next']
+        self.client.delete(f'/api/budget/delete/{budget.id}/')
+        data = self.client.get('/api/budget/changes/', {'since': since}).json()
+        self.assertEqual(data['deleted']['budgets'], [budget.id])
+
+        # Pruning keeps tombstones inside the retention window
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 0 tombstones.', out.getvalue())
+
+    # Test spending analytics bucketed by day, week and month
+    def test_get_budget_analytics(self):
+        budget = self.create_budget(name='Test Budget', start_date='2025-01-01', end_date=None)
+        food = Category.objects.create(name='Food', start_amount='100.00', current_amount='100.00', budget=budget)
+        rent = Category.objects.create(name='Rent', start_amount='900.00', current_amount='900.00', budget=budget)
+        for cost, payback, date, category in [
+            ('10.00', '1.00', '2025-01-06', food),
+            ('5.50', '0.00', '2025-01-06', food),
+            ('7.25', '0.00', '2025-01-08', food),
+            ('800.00', '0.00', '2025-02-01', rent),
+        ]:
+            Expense.objects.create(cost=cost, store='Store', payback_amount=payback, date=date, notes='', category=category)
+
+        url = f'/api/budget/{budget.id}/analytics/'
+        response = self.client.get(url, {'interval': 'day', 'from': '2025-01-01', 'to': '2025-02-28'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], {
+            'period': '2025-01-06',
+            'category': food.id,
+            'category_name': 'Food',
+            'total_cost': '15.50',
+            'total_payback': '1.00',
+            'expense_count': 2,
+        })
+
+        # 2025-01-06 and 2025-01-08 fall in the same week
+        results = self.client.get(url, {'interval': 'week'}).json()['results']
+        self.assertEqual([(r['period'], r['total_cost']) for r in results], [('2025-01-06', '22.75'), ('2025-01-27', '800.00')])
+
+        results = self.client.get(url).json()['results']
+        self.assertEqual([(r['period'], r['category_name']) for r in results], [('2025-01-01', 'Food'), ('2025-02-01', 'Rent')])
+
+        response = self.client.get(url, {'interval': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that daily analytics are limited to a window that can be paged back
+    @override_settings(BUDGET_ANALYTICS_MAX_DAYS=3)
+    def test_get_budget_analytics_window(self):
+        budget = self.create_budget(name='Test Budget', start_date='2025-01-01', end_date=None)
+        url = f'/api/budget/{budget.id}/analytics/'
+        data = self.client.get(url, {'interval': 'day'}).json()
+        self.assertEqual((data['from'], data['to'], data['results']), (None, None, []))
+
+        food = Category.objects.create(name='Food', start_amount='100.00', current_amount='100.00', budget=budget)
+        for day in (1, 2, 4, 5, 6):
+            Expense.objects.create(cost='1.00', store='Store', payback_amount='0.00', date=date(2025, 1, day), notes='', category=food)
+
+        # By default the window ends on the latest day with spending
+        data = self.client.get(url, {'interval': 'day'}).json()
+        self.assertEqual((data['from'], data['to']), ('2025-01-04', '2025-01-06'))
+        self.assertEqual([row['period'] for row in data['results']], ['2025-01-04', '2025-01-05', '2025-01-06'])
+
+        data = self.client.get(url, {'interval': 'day', 'to': '2025-01-03'}).json()
+        self.assertEqual([row['period'] for row in data['results']], ['2025-01-01', '2025-01-02'])
+        data = self.client.get(url, {'interval': 'day', 'from': '2025-01-02'}).json()
+        self.assertEqual(data['to'], '2025-01-04')
+
+        # Other intervals take the same filter without a default window
+        data = self.client.get(url, {'from': '2025-01-05', 'to': '2025-01-31'}).json()
+        self.assertEqual([row['total_cost'] for row in data['results']], ['2.00'])
+
+        for params in (
+            {'interval': 'day', 'from': '2025-01-01', 'to': '2025-01-04'},
+            {'interval': 'day', 'from': '2025-01-04', 'to': '2025-01-01'},
+            {'interval': 'month', 'from': '2025-02-01', 'to': '2025-01-01'},
+            {'interval': 'day', 'from': 'yesterday'},
+            {'interval': 'day', 'from': '9999-12-30'},
+            {'interval': 'day', 'to': '0001-01-02'},
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     # Test creating a budget with invalid date format
     def test_create_budget_invalid_date_format(self):
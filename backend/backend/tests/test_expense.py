@@ -0,0 +1,378 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from backend.models import Budget, Category, DailyCategorySpend, Expense, UserBudgetMap
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from decimal import Decimal
+from datetime import date
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.core.cache import caches
+from backend.budget.export import expense_rows
+from backend.budget.search import inverted_indexes
+from backend.budget.versioning import get_version
+
+class ExpenseTests(TestCase):
+
+    def setUp(self):
+        # User ids and budget versions repeat across tests, so drop anything cached on them
+        for cache in caches.all():
+            cache.clear()
+        inverted_indexes.clear()
+
+        # Create a user with one budget and category
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+
+        self.budget = Budget.objects.create(name='Test Budget', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=self.user, budget=self.budget)
+        self.category = Category.objects.create(
+            name='Groceries',
+            start_amount='100.00',
+            current_amount='100.00',
+            budget=self.budget,
+        )
+
+        # Initialize the API client and authenticate
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def expense_row(self, **fields):
+        row = {
+            'cost': '10.00',
+            'store': 'Store',
+            'payback_amount': '2.50',
+            'date': '2025-01-02',
+            'notes': 'Imported',
+            'category': self.category.id,
+        }
+        row.update(fields)
+        return row
+
+    # Test bulk creating expenses from a JSON array
+    def test_bulk_create_expenses_json(self):
+        rows = [self.expense_row() for _ in range(3)]
+        response = self.client.post('/api/budget/expenses/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(Expense.objects.filter(category=self.category).count(), 3)
+
+        # 100.00 - 3 * (10.00 - 2.50)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('77.50'))
+
+    # Test bulk creating expenses from an NDJSON body
+    def test_bulk_create_expenses_ndjson(self):
+        body = '\n'.join(json.dumps(self.expense_row(notes='')) for _ in range(2)) + '\n'
+        response = self.client.post(
+            '/api/budget/expenses/bulk/',
+            body,
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+
+    # Test that an invalid row rejects the whole request by default
+    def test_bulk_create_expenses_invalid_row(self):
+        rows = [self.expense_row(), self.expense_row(cost='not-a-number')]
+        response = self.client.post('/api/budget/expenses/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cost', response.data[1])
+        self.assertEqual(Expense.objects.count(), 0)
+
+    # Test that partial mode saves the valid rows and reports the rest
+    def test_bulk_create_expenses_partial(self):
+        rows = [self.expense_row(), self.expense_row(date='bad-date'), self.expense_row()]
+        response = self.client.post('/api/budget/expenses/bulk/?partial=true', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['row'], 1)
+        self.assertIn('date', response.data['errors'][0]['errors'])
+
+    # Test that expenses cannot be added to another user's category
+    def test_bulk_create_expenses_foreign_category(self):
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        budget = Budget.objects.create(name='Other Budget', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=other, budget=budget)
+        category = Category.objects.create(
+            name='Other', start_amount='0.00', current_amount='0.00', budget=budget,
+        )
+
+        response = self.client.post(
+            '/api/budget/expenses/bulk/',
+            [self.expense_row(category=category.id)],
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data[0])
+
+    # Test that the query count does not grow with the number of rows
+    def test_bulk_create_expenses_query_count(self):
+        rows = [self.expense_row() for _ in range(50)]
+        # Token, category lookup, savepoint, insert, amount update, rollup
+        # (savepoint, delete, aggregate, insert, release), budget members,
+        # version bump, release savepoint
+        with self.assertNumQueries(13):
+            response = self.client.post('/api/budget/expenses/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    # Test that the body must be a list
+    def test_bulk_create_expenses_not_a_list(self):
+        response = self.client.post('/api/budget/expenses/bulk/', self.expense_row(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Expected a list of expenses.')
+
+    # Test exporting a budget's expenses as CSV
+    def test_export_expenses_csv(self):
+        self.client.post('/api/budget/expenses/bulk/', [self.expense_row(store='A'), self.expense_row(store='B')], format='json')
+        response = self.client.get(f'/api/budget/export/{self.budget.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,date,store,cost,payback_amount,notes,category')
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].endswith(',2025-01-02,A,10.00,2.50,Imported,Groceries'))
+
+    # Test exporting a budget's expenses as NDJSON
+    def test_export_expenses_ndjson(self):
+        self.client.post('/api/budget/expenses/bulk/', [self.expense_row()], format='json')
+        response = self.client.get(f'/api/budget/export/{self.budget.id}/', {'as': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['cost'], '10.00')
+        self.assertEqual(rows[0]['date'], '2025-01-02')
+        self.assertEqual(rows[0]['category'], 'Groceries')
+
+    # Test that exports read the rows in bounded keyset chunks
+    @override_settings(EXPENSE_EXPORT_CHUNK_SIZE=2)
+    def test_export_expenses_chunks(self):
+        rows = [self.expense_row(store=f'Store {i}') for i in range(5)]
+        self.client.post('/api/budget/expenses/bulk/', rows, format='json')
+        with self.assertNumQueries(3):
+            exported = list(expense_rows(self.budget))
+        self.assertEqual([row[2] for row in exported], [f'Store {i}' for i in range(5)])
+
+    # Test exporting with an unknown format or another user's budget
+    def test_export_expenses_errors(self):
+        response = self.client.get(f'/api/budget/export/{self.budget.id}/', {'as': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/budget/export/9999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def create_expense(self, **fields):
+        row = self.expense_row(category=self.category)
+        row.update(fields)
+        return Expense.objects.create(**row)
+
+    # Test that saving and deleting expenses keeps current_amount in step
+    def test_current_amount_maintained(self):
+        expense = self.create_expense()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('92.50'))
+
+        # Update the cost of a loaded expense
+        expense = Expense.objects.get(pk=expense.pk)
+        expense.cost = Decimal('20.00')
+        expense.save()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('82.50'))
+
+        # Move the expense to another category
+        other = Category.objects.create(
+            name='Dining', start_amount='50.00', current_amount='50.00', budget=self.budget,
+        )
+        expense.category = other
+        expense.save()
+        self.category.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('100.00'))
+        self.assertEqual(other.current_amount, Decimal('32.50'))
+
+        expense.delete()
+        other.refresh_from_db()
+        self.assertEqual(other.current_amount, Decimal('50.00'))
+
+    # Test that edits through instances loaded before another edit do not double count
+    def test_current_amount_stale_instances(self):
+        expense = self.create_expense()
+        first = Expense.objects.get(pk=expense.pk)
+        second = Expense.objects.get(pk=expense.pk)
+
+        first.cost = Decimal('20.00')
+        first.save()
+        second.cost = Decimal('30.00')
+        second.save()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('72.50'))
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 2), Decimal('30.00'), Decimal('2.50'), 1),
+        ])
+
+        # A second delete of the same row changes nothing
+        first.delete()
+        second.delete()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('100.00'))
+        self.assertEqual(self.rollup(), [])
+
+    # Test that the reconciliation command reports and fixes drift
+    def test_reconcile_category_amounts(self):
+        self.create_expense()
+        Category.objects.filter(pk=self.category.pk).update(current_amount='1.00')
+
+        out = StringIO()
+        call_command('reconcile_category_amounts', '--dry-run', stdout=out)
+        self.assertIn(f'Category {self.category.id}: stored 1.00, expected 92.50', out.getvalue())
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('1.00'))
+
+        version = get_version(self.user)
+        out = StringIO()
+        call_command('reconcile_category_amounts', '--chunk-size', '1', stdout=out)
+        self.assertIn('Checked 1 categories, fixed 1 with drift.', out.getvalue())
+        self.assertNotEqual(get_version(self.user), version)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.current_amount, Decimal('92.50'))
+
+    def rollup(self):
+        return list(DailyCategorySpend.objects.order_by('category_id', 'date').values_list(
+            'category_id', 'date', 'total_cost', 'total_payback', 'expense_count',
+        ))
+
+    # Test that the daily rollup follows expense saves, moves and deletes
+    def test_daily_rollup_maintained(self):
+        first = self.create_expense()
+        second = self.create_expense(cost='5.00')
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 2), Decimal('15.00'), Decimal('5.00'), 2),
+        ])
+
+        # Move the second expense to another day
+        second = Expense.objects.get(pk=second.pk)
+        second.date = date(2025, 1, 3)
+        second.save()
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 2), Decimal('10.00'), Decimal('2.50'), 1),
+            (self.category.id, date(2025, 1, 3), Decimal('5.00'), Decimal('2.50'), 1),
+        ])
+
+        Expense.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 3), Decimal('5.00'), Decimal('2.50'), 1),
+        ])
+
+        # Changing an amount in place adjusts the existing row
+        second.cost = Decimal('7.00')
+        second.save()
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 3), Decimal('7.00'), Decimal('2.50'), 1),
+        ])
+
+    # Test that removing an expense from a missing rollup row recomputes it
+    def test_daily_rollup_missing_row(self):
+        first = self.create_expense()
+        second = self.create_expense(cost='5.00')
+        DailyCategorySpend.objects.all().delete()
+
+        Expense.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 2), Decimal('5.00'), Decimal('2.50'), 1),
+        ])
+
+        # Moving the last expense away leaves no row behind
+        DailyCategorySpend.objects.all().delete()
+        second = Expense.objects.get(pk=second.pk)
+        second.date = date(2025, 1, 3)
+        second.save()
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 3), Decimal('5.00'), Decimal('2.50'), 1),
+        ])
+
+    # Test that bulk created expenses are rolled up
+    def test_daily_rollup_bulk_create(self):
+        self.create_expense(date='2025-01-03')
+        rows = [self.expense_row(), self.expense_row(), self.expense_row(date='2025-01-03')]
+        response = self.client.post('/api/budget/expenses/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rollup(), [
+            (self.category.id, date(2025, 1, 2), Decimal('20.00'), Decimal('5.00'), 2),
+            (self.category.id, date(2025, 1, 3), Decimal('20.00'), Decimal('5.00'), 2),
+        ])
+
+    # Test that the backfill command rebuilds the rollup from scratch
+    def test_backfill_daily_spend(self):
+        self.create_expense()
+        self.create_expense(date='2025-01-05')
+        expected = self.rollup()
+        DailyCategorySpend.objects.all().delete()
+        version = get_version(self.user)
+
+        out = StringIO()
+        call_command('backfill_daily_spend', '--chunk-size', '1', stdout=out)
+        self.assertIn('Backfilled 2 rollup rows for 1 categories.', out.getvalue())
+        self.assertEqual(self.rollup(), expected)
+        # Cached analytics of the budget are invalidated
+        self.assertNotEqual(get_version(self.user), version)
+
+    # Test searching expenses by store and notes
+    def test_search_expenses(self):
+        coffee = self.create_expense(store='Corner Coffee', notes='Morning latte', date='2025-01-03')
+        self.create_expense(store='Hardware Store', notes='Coffee table screws')
+        self.create_expense(store='Bakery', notes='Bread')
+
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['store'] for row in response.data['results']], ['Corner Coffee', 'Hardware Store'])
+
+        # Every term must match, as a word prefix
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'COFF lat'})
+        self.assertEqual([row['id'] for row in response.data['results']], [coffee.id])
+
+        # The index follows writes
+        self.create_expense(store='Coffee Roasters', date='2025-01-04')
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'page_size': 2})
+        self.assertEqual([row['store'] for row in response.data['results']], ['Coffee Roasters', 'Corner Coffee'])
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'cursor': response.data['next']})
+        self.assertEqual([row['store'] for row in response.data['results']], ['Hardware Store'])
+        self.assertIsNone(response.data['next'])
+
+    # Test that search only sees the user's own budgets
+    def test_search_expenses_scoped_to_user(self):
+        other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        other_budget = Budget.objects.create(name='Other Budget', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=other_user, budget=other_budget)
+        other_category = Category.objects.create(
+            name='Other', start_amount='10.00', current_amount='10.00', budget=other_budget,
+        )
+        self.create_expense(store='Coffee', category=other_category)
+
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee'})
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get('/api/budget/expenses/search/', {'q': '  '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test narrowing a search to one budget and rejecting malformed budget ids
+    def test_search_expenses_budget_filter(self):
+        coffee = self.create_expense(store='Coffee')
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'budget': self.budget.id})
+        self.assertEqual([row['id'] for row in response.data['results']], [coffee.id])
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'budget': self.budget.id + 1})
+        self.assertEqual(response.data['results'], [])
+        # Ids beyond 32 bits are valid for the 64-bit id columns
+        response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'budget': 2 ** 40})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+        # '²' passes str.isdigit() but is not an integer
+        for budget_id in ('abc', '\u00b2', '-1', str(2 ** 63)):
+            response = self.client.get('/api/budget/expenses/search/', {'q': 'coffee', 'budget': budget_id})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data['detail'], 'Invalid budget.')
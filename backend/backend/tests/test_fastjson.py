@@ -0,0 +1,81 @@
+from decimal import Decimal
+from datetime import date
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from backend.models import Budget, Category, UserBudgetMap
+from backend.budget.analytics import spending_by_period
+from backend.budget.fastjson import FastJSONRenderer, get_plan, serialize_queryset
+from backend.budget.serializers import BudgetSerializer, SpendingSerializer
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+
+class FastJSONTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        for name, start_date in [('Rent\u2028"quoted"', '2025-01-01'), ('Café', '2025-02-01')]:
+            budget = Budget.objects.create(name=name, start_date=start_date)
+            UserBudgetMap.objects.create(user=self.user, budget=budget)
+        self.budget = budget
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    # Test that the field plan matches the serializer, including None and non-ASCII values
+    def test_plan_matches_serializer(self):
+        budgets = Budget.objects.order_by('id')
+        self.assertEqual(serialize_queryset(budgets, BudgetSerializer), BudgetSerializer(budgets, many=True).data)
+
+        rows = [{
+            'period': self.budget.start_date, 'category_id': 1, 'category__name': 'Food',
+            'total_cost': Decimal('5'), 'total_payback': Decimal('0.125'), 'expense_count': 2,
+        }]
+        self.assertEqual(get_plan(SpendingSerializer).serialize(rows), SpendingSerializer(rows, many=True).data)
+
+    # Test that the fast renderer produces the same bytes as JSONRenderer
+    def test_renderer_matches_json_renderer(self):
+        data = {'results': BudgetSerializer(Budget.objects.order_by('id'), many=True).data, 'next': None}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    # Test that the list endpoint's bytes are unchanged by the fast path
+    def test_list_endpoint_bytes(self):
+        response = self.client.get('/api/budget/get_all_current/', {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = Budget.objects.order_by('start_date', 'id')[:1]
+        expected = JSONRenderer().render({
+            'results': BudgetSerializer(first, many=True).data,
+            'next': response.json()['next'],
+        })
+        self.assertEqual(response.content, expected)
+        self.assertIsNotNone(response.json()['next'])
+
+    # Test that the analytics endpoint's bytes are unchanged by the fast path
+    def test_analytics_endpoint_bytes(self):
+        category = Category.objects.create(name='Food', start_amount='50.00', current_amount='50.00', budget=self.budget)
+        category.expenses.create(cost='12.50', store='Store', payback_amount='0.00', date='2025-02-03', notes='')
+
+        response = self.client.get(f'/api/budget/{self.budget.id}/analytics/')
+        expected = JSONRenderer().render({
+            'interval': 'month',
+            'from': None,
+            'to': None,
+            'results': SpendingSerializer(spending_by_period(self.budget, 'month'), many=True).data,
+        })
+        self.assertEqual(response.content, expected)
+
+        # Window dates render like DRF renders them
+        response = self.client.get(f'/api/budget/{self.budget.id}/analytics/', {'interval': 'day'})
+        expected = JSONRenderer().render({
+            'interval': 'day',
+            'from': date(2024, 11, 4),
+            'to': date(2025, 2, 3),
+            'results': SpendingSerializer(spending_by_period(self.budget, 'day'), many=True).data,
+        })
+        self.assertEqual(response.content, expected)
@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, TestCase, override_settings
+from backend.middleware import RequestMetricsMiddleware
+from rest_framework import status
+from backend.models import Budget, UserBudgetMap
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from backend.budget.search import inverted_indexes
+
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        # User ids and budget versions repeat across tests, so drop anything cached on them
+        for cache in caches.all():
+            cache.clear()
+        inverted_indexes.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.budget = Budget.objects.create(name='Test Budget', start_date='2025-01-01')
+        UserBudgetMap.objects.create(user=self.user, budget=self.budget)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    # Test the Server-Timing header and the per-view histograms
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_request_metrics_recorded(self):
+        response = self.client.get(f'/api/budget/get/{self.budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+        response = Client().get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn('trackerjacker_request_duration_seconds_count{view="get_budget"}', content)
+        self.assertIn('trackerjacker_db_queries_bucket{view="get_budget",le="+Inf"}', content)
+        self.assertIn('trackerjacker_response_size_bytes_sum{view="get_budget"}', content)
+
+    # Test that the middleware stays async under ASGI and still times requests
+    async def test_request_metrics_async(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(get_response)))
+        response = await AsyncClient().get('/api/auth/async/user/', headers={'Authorization': 'Token ' + self.token.key})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+    # Test that requests are not timed when sampling is off
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_request_metrics_disabled(self):
+        response = self.client.get(f'/api/budget/get/{self.budget.id}/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Server-Timing', response)
+
+    # Test that metrics need the scrape token or a staff session
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_require_authorization(self):
+        anonymous = Client()
+        response = anonymous.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="metrics"')
+
+        response = anonymous.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong-token')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # An API token of a regular user is not enough
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        staff = Client()
+        staff.force_login(User.objects.create_user(username='staffuser', password='testpassword', is_staff=True))
+        response = staff.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # Test that without a configured token the endpoint stays closed
+    def test_metrics_without_token(self):
+        response = Client().get('/api/metrics/', HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
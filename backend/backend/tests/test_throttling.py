@@ -0,0 +1,140 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.cache import caches
+from backend.authentication.throttling import CacheWindowStore, TokenBucketStore, local_store, parse_rate
+import time
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TokenBucketTests(TestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+
+    # Test that a full bucket allows exactly its capacity, then refills at the set rate
+    def test_token_bucket_accuracy(self):
+        clock = FakeClock()
+        store = TokenBucketStore(max_keys=10, clock=clock)
+        allowed = sum(store.consume('key', 10, 60) == 0 for _ in range(25))
+        self.assertEqual(allowed, 10)
+
+        # One token every 6 seconds
+        self.assertAlmostEqual(store.consume('key', 10, 60), 6.0)
+        clock.now += 6
+        self.assertEqual(store.consume('key', 10, 60), 0)
+        self.assertGreater(store.consume('key', 10, 60), 0)
+
+        # Over a long period the allowed count matches the rate
+        allowed = 0
+        for _ in range(600):
+            clock.now += 1
+            allowed += store.consume('key', 10, 60) == 0
+        self.assertEqual(allowed, 100)
+
+    # Test that buckets are independent and bounded in number
+    def test_token_bucket_keys(self):
+        store = TokenBucketStore(max_keys=2, clock=FakeClock())
+        store.consume('a', 1, 60)
+        self.assertGreater(store.consume('a', 1, 60), 0)
+        self.assertEqual(store.consume('b', 1, 60), 0)
+        store.consume('c', 1, 60)
+        # 'a' was least recently used and has been evicted
+        self.assertEqual(store.consume('a', 1, 60), 0)
+
+    # Test that checking a bucket stays cheap
+    def test_token_bucket_throughput(self):
+        store = TokenBucketStore(max_keys=100000)
+        started = time.perf_counter()
+        for i in range(50000):
+            store.consume(f'ip:{i % 1000}', 30, 60)
+        rate = 50000 / (time.perf_counter() - started)
+        self.assertGreater(rate, 20000)
+
+    # Test the shared-cache sliding window
+    def test_cache_window_store(self):
+        caches['default'].clear()
+        clock = FakeClock()
+        clock.now = 6000.0  # start of a window
+        store = CacheWindowStore('default', clock=clock)
+        allowed = sum(store.consume('key', 10, 60) == 0 for _ in range(15))
+        self.assertEqual(allowed, 10)
+
+        # Halfway through the next window, half of the previous window still counts
+        clock.now += 90
+        allowed = sum(store.consume('key', 10, 60) == 0 for _ in range(10))
+        self.assertEqual(allowed, 2)
+
+class AuthThrottleTests(TestCase):
+
+    def setUp(self):
+        local_store.clear()
+        self.user = User.objects.create_user(username='testuser', password='mypass12345')
+        self.client = APIClient()
+
+    # Test that repeated logins for one username are rejected before any work
+    @override_settings(AUTH_THROTTLE_RATES={'ip': '100/min', 'username': '3/min'})
+    def test_login_throttled_by_username(self):
+        data = {'username': 'testuser', 'password': 'wrongpassword'}
+        for _ in range(3):
+            response = self.client.post('/api/auth/login/', data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/auth/login/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        # Other usernames from the same client are still allowed
+        response = self.client.post('/api/auth/login/', {'username': 'other', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that one client IP cannot spread attempts over many usernames
+    @override_settings(AUTH_THROTTLE_RATES={'ip': '2/min', 'username': '100/min'})
+    def test_register_throttled_by_ip(self):
+        for i in range(2):
+            data = {'username': f'user{i}', 'password': 'mypass12345', 'password2': 'mypass12345'}
+            response = self.client.post('/api/auth/register/', data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {'username': 'user2', 'password': 'mypass12345', 'password2': 'mypass12345'}
+        response = self.client.post('/api/auth/register/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    # Test that a client rotating X-Forwarded-For is still throttled per IP
+    @override_settings(AUTH_THROTTLE_RATES={'ip': '2/min', 'username': '100/min'})
+    def test_login_throttle_ignores_spoofed_forwarded_for(self):
+        for i in range(2):
+            response = self.client.post(
+                '/api/auth/login/', {'username': f'user{i}', 'password': 'x'},
+                format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}',
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'user2', 'password': 'x'},
+            format='json', HTTP_X_FORWARDED_FOR='10.0.0.2',
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    # Test that behind one proxy only the address it appended is trusted
+    @override_settings(AUTH_THROTTLE_RATES={'ip': '2/min', 'username': '100/min'})
+    def test_login_throttle_behind_proxy(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            statuses = [
+                self.client.post(
+                    '/api/auth/login/', {'username': f'user{i}', 'password': 'x'},
+                    format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 203.0.113.7',
+                ).status_code
+                for i in range(3)
+            ]
+        self.assertEqual(statuses, [400, 400, 429])
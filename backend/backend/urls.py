@@ -17,10 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from .views.health import health_check
+from .views.metrics import metrics
+from .views.batch import batch
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health/', health_check, name='health_check'),
+    path('api/metrics/', metrics, name='metrics'),
+    path('api/batch/', batch, name='batch'),
     path('api/auth/', include('backend.authentication.urls')),
     path('api/budget/', include('backend.budget.urls')),
 ]
@@ -0,0 +1,93 @@
+import json
+import logging
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import (
+    api_view,
+    permission_classes
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+def build_subrequest(request, path, query_string):
+    """
+    Build a GET request for path that reuses the batch request's headers and
+    carries its already authenticated user, so the sub-view skips authentication.
+    Plain Django views read the same user from request.user.
+    """
+    subrequest = HttpRequest()
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.META = {
+        key: value for key, value in request.META.items()
+        if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE')
+    }
+    subrequest.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query_string})
+    subrequest.GET = QueryDict(query_string)
+    subrequest.user = request.user
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def run_subrequest(request, url):
+    parts = urlsplit(url)
+    if not parts.path.startswith('/api/') or parts.scheme or parts.netloc:
+        return status.HTTP_400_BAD_REQUEST, {'detail': 'Only /api/ paths can be batched.'}
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}
+
+    subrequest = build_subrequest(request, parts.path, parts.query)
+    view = match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(subrequest, *match.args, **match.kwargs)
+        if not response.streaming and hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        # One failing sub-request must not fail the whole batch
+        logger.exception('Batched request to %s failed', parts.path)
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'detail': 'Internal server error.'}
+
+    if response.streaming:
+        return status.HTTP_400_BAD_REQUEST, {'detail': 'Streaming responses cannot be batched.'}
+    if not response.content:
+        return response.status_code, None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return response.status_code, json.loads(response.content)
+    return response.status_code, response.content.decode()
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """
+    Run several GET requests in one round trip.
+    Expects {"requests": [{"path": "/api/auth/user/"}, ...]} and returns each
+    sub-response's status and body in the same order.
+    """
+    items = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) and isinstance(item.get('path'), str) for item in items):
+        return Response({'detail': 'Expected a list of requests with a path.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        return Response(
+            {'detail': f'At most {settings.BATCH_MAX_REQUESTS} requests can be batched.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    responses = []
+    for item in items:
+        status_code, body = run_subrequest(request, item['path'])
+        responses.append({'path': item['path'], 'status': status_code, 'body': body})
+    return Response({'responses': responses})
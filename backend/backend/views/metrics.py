@@ -0,0 +1,37 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from backend.budget import response_cache
+from backend.instrumentation import render_prometheus
+
+
+@require_GET
+def metrics(request):
+    """
+    Expose this process's counters in the Prometheus text format. Scrapers
+    authenticate with "Authorization: Bearer <METRICS_TOKEN>"; staff users with
+    a session may also read it. Everyone else gets a 401.
+    """
+    if not metrics_allowed(request):
+        response = HttpResponse('Authentication required.\n', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+        return response
+
+    lines = [
+        '# HELP trackerjacker_response_cache_requests_total Budget response cache lookups.',
+        '# TYPE trackerjacker_response_cache_requests_total counter',
+    ]
+    for outcome, count in sorted(response_cache.stats.items()):
+        lines.append(f'trackerjacker_response_cache_requests_total{{outcome="{outcome}"}} {count}')
+    lines += render_prometheus()
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4')
+
+
+def metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if token and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
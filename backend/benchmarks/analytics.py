@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Seed a throwaway test database with one budget of many expenses and time the
+analytics endpoint per interval, both uncached and from the response cache.
+
+Runs offline against SQLite by default (backend.settings_benchmark); set
+BENCHMARK_DATABASE=mysql to use a local MySQL container instead.
+
+    python benchmarks/analytics.py --expenses 1000000 --categories 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings_benchmark')
+
+from seed import seed  # noqa: E402
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from backend.budget.analytics import INTERVALS, day_window, spending_by_period  # noqa: E402
+from backend.models import Budget  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--expenses', type=int, default=100000, help='Expenses to seed.')
+    parser.add_argument('--categories', type=int, default=20, help='Categories in the budget.')
+    parser.add_argument('--days', type=int, default=365, help='Days the expense dates are spread over.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        # One user with one budget; the seeder also fills the daily rollup
+        seeded = seed(1, 1, args.categories, args.expenses // args.categories, days=args.days)[0]
+        user = User.objects.get(pk=seeded.id)
+        budget = Budget.objects.get(pk=seeded.budget_ids[0])
+        expenses = args.expenses // args.categories * args.categories
+        print(f'seeded {expenses} expenses in {time.perf_counter() - started:.1f}s')
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = f'/api/budget/{budget.id}/analytics/'
+        response_cache = caches[settings.RESPONSE_CACHE_ALIAS]
+
+        def uncached(interval):
+            response_cache.clear()
+            client.get(url, {'interval': interval})
+
+        print(f"{'interval':<8} {'rows':>6} {'query p50':>10} {'view p50':>9} {'view max':>9} {'cached p50':>11}")
+        for interval in INTERVALS:
+            # The endpoint's default window: daily series are capped, the others are not
+            window = day_window(budget) if interval == 'day' else (None, None)
+            rows = len(spending_by_period(budget, interval, *window))
+            query_p50, _ = timed(lambda: list(spending_by_period(budget, interval, *window)), args.repeat)
+            view_p50, view_max = timed(lambda: uncached(interval), args.repeat)
+            cached_p50, _ = timed(lambda: client.get(url, {'interval': interval}), args.repeat)
+            print(f'{interval:<8} {rows:>6} {query_p50:>8.1f}ms {view_p50:>7.1f}ms '
+                  f'{view_max:>7.1f}ms {cached_p50:>9.2f}ms')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Compare how the sync and async budget read endpoints hold up as the number of
+concurrent connections grows.
+
+Serve the app through ASGI first, e.g.
+
+    GUNICORN_WORKERS=1 GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn backend.asgi
+
+then run
+
+    python benchmarks/async_capacity.py --token <token> --budget <id>
+"""
+
+import argparse
+
+from loadtest import run
+
+ENDPOINTS = (
+    ('sync', '/api/budget/get/{id}/'),
+    ('async', '/api/budget/async/get/{id}/'),
+    ('sync', '/api/budget/get_all_current/'),
+    ('async', '/api/budget/async/get_all_current/'),
+    ('sync', '/api/auth/user/'),
+    ('async', '/api/auth/async/user/'),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:7004', help='Base URL of the server.')
+    parser.add_argument('--token', required=True, help='Auth token of a user owning the budget.')
+    parser.add_argument('--budget', type=int, required=True, help='Budget id to request.')
+    parser.add_argument('--levels', default='8,32,128,256', help='Comma separated concurrency levels.')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and level.')
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'path':<36} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for level in (int(level) for level in args.levels.split(',')):
+        for mode, path in ENDPOINTS:
+            path = path.format(id=args.budget)
+            result = run(args.url, path, level, args.requests, args.token)
+            print(f"{mode:<6} {path:<36} {level:>5} {result['throughput']:>9.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Compare latency and bytes on the wire for API responses with and without gzip.
+Point it at nginx (production profile) or at Django with DJANGO_GZIP_RESPONSES=1:
+
+    python benchmarks/compression.py --url http://localhost --token <token> \\
+        --path /api/budget/get_all_current/?page_size=200 --path /api/budget/export/1/
+"""
+
+import argparse
+
+from loadtest import run
+
+ENCODINGS = (
+    ('identity', {'Accept-Encoding': 'identity'}),
+    ('gzip', {'Accept-Encoding': 'gzip'}),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost', help='Base URL of nginx or the backend.')
+    parser.add_argument('--path', action='append', help='Path to request; repeat for several.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients.')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per path and encoding.')
+    parser.add_argument('--token', help='Auth token for authenticated endpoints.')
+    args = parser.parse_args()
+
+    print(f"{'path':<44} {'encoding':<9} {'bytes':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for path in args.path or ['/api/budget/get_all_current/?page_size=200']:
+        baseline = None
+        for name, headers in ENCODINGS:
+            result = run(args.url, path, args.concurrency, args.requests, args.token, headers)
+            print(f"{path:<44} {name:<9} {result['mean_bytes']:>9.0f} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+            if baseline is None:
+                baseline = result
+            elif baseline['mean_bytes']:
+                saved = 1 - result['mean_bytes'] / baseline['mean_bytes']
+                print(f"{'':<44} {'delta':<9} {saved:>8.0%} smaller, "
+                      f"p50 {result['p50_ms'] - baseline['p50_ms']:+.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Minimal HTTP load test for the backend API.
+
+Sends a fixed number of GET requests with a pool of concurrent clients and
+reports throughput and latency percentiles. Run it once against the dev
+server and once against the production profile to compare them:
+
+    python benchmarks/loadtest.py --url http://localhost:7004 --path /api/health/
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(url, path, concurrency, total, token=None, headers=None):
+    target = urlsplit(url)
+    headers = dict(headers or {})
+    if token:
+        headers['Authorization'] = f'Token {token}'
+    local = threading.local()
+
+    def request(_):
+        # One keep-alive connection per client thread
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        started = time.perf_counter()
+        try:
+            local.conn.request('GET', path, headers=headers)
+            response = local.conn.getresponse()
+            # http.client does not decode Content-Encoding, so this is the wire size
+            size = len(response.read())
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            del local.conn
+            status = None
+            size = 0
+        return time.perf_counter() - started, status, size
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(request, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, status, _ in results if status and status < 400]
+    sizes = [size for _, status, size in results if status and status < 400]
+    errors = total - len(latencies)
+    return {
+        'requests': total,
+        'errors': errors,
+        'mean_bytes': statistics.mean(sizes) if sizes else 0.0,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000 if latencies else 0.0,
+        'p95_ms': percentile(latencies, 95) * 1000 if latencies else 0.0,
+        'p99_ms': percentile(latencies, 99) * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:7004', help='Base URL of the server.')
+    parser.add_argument('--path', default='/api/health/', help='Path to request.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients.')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests to send.')
+    parser.add_argument('--token', help='Auth token for authenticated endpoints.')
+    args = parser.parse_args()
+
+    result = run(args.url, args.path, args.concurrency, args.requests, args.token)
+    print(f"{args.url}{args.path}  concurrency={args.concurrency}")
+    print(f"  requests   {result['requests']} ({result['errors']} errors)")
+    print(f"  throughput {result['throughput']:.1f} req/s")
+    print(f"  latency    mean {result['mean_ms']:.1f} ms, p50 {result['p50_ms']:.1f} ms, "
+          f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
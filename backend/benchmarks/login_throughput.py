@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Measure password verifications (the CPU cost of a login) per second per core
+for each configured hasher, using the same bounded pool as the login view.
+
+    python benchmarks/login_throughput.py --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import check_password, get_hashers, make_password  # noqa: E402
+
+
+def measure(algorithm, workers, seconds):
+    password = 'correct horse battery staple'
+    encoded = make_password(password, hasher=algorithm)
+    deadline = time.perf_counter() + seconds
+
+    def verify_until_deadline():
+        count = 0
+        while time.perf_counter() < deadline:
+            check_password(password, encoded)
+            count += 1
+        return count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(lambda _: verify_until_deadline(), range(workers)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5, help='Duration of each measurement.')
+    parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASH_WORKERS,
+                        help='Hashing threads (defaults to PASSWORD_HASH_WORKERS).')
+    args = parser.parse_args()
+
+    print(f"{'hasher':<16} {'workers':>7} {'logins/s':>10} {'per core':>9}")
+    for hasher in get_hashers():
+        try:
+            rate = measure(hasher.algorithm, args.workers, args.seconds)
+        except ValueError as exc:
+            # The hasher's library is not installed
+            print(f"{hasher.algorithm:<16} skipped: {exc}")
+            continue
+        print(f"{hasher.algorithm:<16} {args.workers:>7} {rate:>10.1f} {rate / args.workers:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
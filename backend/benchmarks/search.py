@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Seed a throwaway test database with expenses and compare expense search
+(FULLTEXT on MySQL, the inverted-index fallback elsewhere) with an icontains scan.
+
+Runs offline against SQLite by default (backend.settings_benchmark); set
+BENCHMARK_DATABASE=mysql to measure the FULLTEXT index.
+
+    python benchmarks/search.py --expenses 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings_benchmark')
+
+from seed import seed  # noqa: E402
+
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from backend.budget.search import inverted_indexes, search_expenses  # noqa: E402
+from backend.models import Budget, Expense  # noqa: E402
+
+WORDS = [
+    'coffee', 'groceries', 'rent', 'fuel', 'pharmacy', 'bakery', 'hardware', 'cinema',
+    'books', 'parking', 'insurance', 'gift', 'lunch', 'dinner', 'taxi', 'train',
+    'internet', 'phone', 'gym', 'laundry', 'market', 'repair', 'garden', 'toys',
+]
+
+
+def describe(rng):
+    store = f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}'
+    return store, ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(0, 12)))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--expenses', type=int, default=100000, help='Expenses to seed.')
+    parser.add_argument('--query', default='coffee lunch', help='Search terms.')
+    parser.add_argument('--page-size', type=int, default=50, help='Rows fetched per search.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        # One user with one category holding every expense
+        user = seed(1, 1, 1, args.expenses, describe=describe)[0]
+        print(f'seeded {args.expenses} expenses in {time.perf_counter() - started:.1f}s')
+
+        expenses = Expense.objects.filter(category__budget__in=Budget.objects.for_user(user.id))
+        terms = args.query.split()
+        contains = Q()
+        for term in terms:
+            contains &= Q(store__icontains=term) | Q(notes__icontains=term)
+
+        def run_icontains():
+            return list(expenses.filter(contains).order_by('-date', '-id')[:args.page_size])
+
+        def run_search():
+            return list(search_expenses(expenses, args.query, user.id).order_by('-date', '-id')[:args.page_size])
+
+        def run_search_cold():
+            inverted_indexes.clear()
+            return run_search()
+
+        engine = 'fulltext' if connection.vendor == 'mysql' else 'inverted index'
+        print(f'{"method":<24} {"p50":>9}')
+        print(f'{"icontains":<24} {timed(run_icontains, args.repeat):>7.1f}ms')
+        if connection.vendor != 'mysql':
+            print(f'{engine + " (build)":<24} {timed(run_search_cold, args.repeat):>7.1f}ms')
+        print(f'{engine:<24} {timed(run_search, args.repeat):>7.1f}ms')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Seed users, shared budgets, categories and expenses with bulk_create.
+
+Every user gets an auth token and owns budgets_per_user budgets, each with
+categories_per_budget categories of expenses_per_category expenses. Used by
+benchmarks/suite.py; run directly to fill the configured database:
+
+    python benchmarks/seed.py --users 100 --budgets 3 --categories 10 --expenses 1000
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import transaction  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+from backend.models import Budget, Category, DailyCategorySpend, Expense, UserBudgetMap  # noqa: E402
+
+PASSWORD = 'benchmark-password'
+
+START_DATE = datetime.date(2024, 1, 1)
+
+
+@dataclass
+class SeededUser:
+    id: int
+    username: str
+    token: str
+    budget_ids: list = field(default_factory=list)
+    category_ids: list = field(default_factory=list)
+
+
+def chunks(items, size):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def store_and_notes(rng):
+    return f'Store {rng.randrange(50)}', ''
+
+
+def seed(users, budgets_per_user, categories_per_budget, expenses_per_category,
+         prefix='bench-', days=365, batch_size=None, rng_seed=0, describe=store_and_notes):
+    """
+    Seed the data set and return a SeededUser per user. describe(rng) returns the
+    (store, notes) of each expense. Primary keys are read back by name because
+    bulk_create does not return them on MySQL.
+    """
+    batch_size = batch_size or settings.EXPENSE_BULK_BATCH_SIZE
+    rng = random.Random(rng_seed)
+    # Hash once; every seeded user shares the password
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(username=f'{prefix}user-{n}', password=password) for n in range(users)],
+            batch_size=batch_size,
+        )
+        seeded = {
+            user_id: SeededUser(user_id, username, Token.generate_key())
+            for username, user_id in User.objects.filter(username__startswith=f'{prefix}user-').values_list('username', 'id')
+        }
+        Token.objects.bulk_create(
+            [Token(key=user.token, user_id=user.id) for user in seeded.values()], batch_size=batch_size,
+        )
+
+        Budget.objects.bulk_create(
+            [
+                Budget(name=f'{prefix}{user.id}-{n}', start_date=START_DATE)
+                for user in seeded.values()
+                for n in range(budgets_per_user)
+            ],
+            batch_size=batch_size,
+        )
+        owners = {}
+        for budget_id, name in Budget.objects.filter(name__startswith=prefix).values_list('id', 'name'):
+            owner = int(name[len(prefix):].split('-')[0])
+            seeded[owner].budget_ids.append(budget_id)
+            owners[budget_id] = owner
+        UserBudgetMap.objects.bulk_create(
+            [UserBudgetMap(user_id=owner, budget_id=budget_id) for budget_id, owner in owners.items()],
+            batch_size=batch_size,
+        )
+
+        Category.objects.bulk_create(
+            [
+                Category(name=f'Category {n}', start_amount=1000, current_amount=1000, budget_id=budget_id)
+                for budget_id in owners
+                for n in range(categories_per_budget)
+            ],
+            batch_size=batch_size,
+        )
+        category_ids = []
+        for category_id, budget_id in Category.objects.filter(budget_id__in=owners).values_list('id', 'budget_id'):
+            seeded[owners[budget_id]].category_ids.append(category_id)
+            category_ids.append(category_id)
+
+    # Expenses are inserted one transaction per batch so millions of rows do not
+    # build up in a single transaction
+    pending = []
+    for category_id in category_ids:
+        for _ in range(expenses_per_category):
+            store, notes = describe(rng)
+            pending.append(Expense(
+                cost=Decimal(rng.randrange(100, 20000)) / 100,
+                store=store,
+                payback_amount=Decimal('0.00'),
+                date=START_DATE + datetime.timedelta(days=rng.randrange(days)),
+                notes=notes,
+                category_id=category_id,
+            ))
+            if len(pending) >= batch_size:
+                Expense.objects.bulk_create(pending)
+                pending = []
+    if pending:
+        Expense.objects.bulk_create(pending)
+
+    # Bring the derived data in line with the expenses
+    for chunk in chunks(category_ids, batch_size):
+        with transaction.atomic():
+            Category.objects.filter(id__in=chunk).recompute_current_amount()
+            DailyCategorySpend.objects.rebuild(chunk)
+
+    return list(seeded.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10, help='Users to create.')
+    parser.add_argument('--budgets', type=int, default=2, help='Budgets per user.')
+    parser.add_argument('--categories', type=int, default=5, help='Categories per budget.')
+    parser.add_argument('--expenses', type=int, default=100, help='Expenses per category.')
+    parser.add_argument('--prefix', default='bench-', help='Prefix of seeded usernames and budget names.')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    users = seed(args.users, args.budgets, args.categories, args.expenses, prefix=args.prefix)
+    expenses = args.users * args.budgets * args.categories * args.expenses
+    print(f'seeded {len(users)} users and {expenses} expenses in {time.perf_counter() - started:.1f}s')
+    print(f'password: {PASSWORD}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Compare BudgetSerializer(many=True) + JSONRenderer with the precompiled field plan
++ FastJSONRenderer on in-memory rows. No database is needed.
+
+    python benchmarks/serialization.py --rows 10000
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from backend.budget import fastjson  # noqa: E402
+from backend.budget.fastjson import FastJSONRenderer, get_plan  # noqa: E402
+from backend.budget.serializers import BudgetSerializer  # noqa: E402
+from backend.models import Budget  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='Budgets per response.')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed runs per measurement.')
+    args = parser.parse_args()
+
+    start = datetime.date(2024, 1, 1)
+    rows = [
+        {'id': n, 'name': f'Budget {n}', 'start_date': start + datetime.timedelta(days=n % 365), 'end_date': None}
+        for n in range(args.rows)
+    ]
+    budgets = [Budget(**row) for row in rows]
+    plan = get_plan(BudgetSerializer)
+
+    def serializer_path():
+        return JSONRenderer().render({'results': BudgetSerializer(budgets, many=True).data})
+
+    def plan_path():
+        return FastJSONRenderer().render({'results': plan.serialize(rows)})
+
+    assert serializer_path() == plan_path()
+    encoder = 'orjson' if fastjson.orjson is not None else 'stdlib json'
+    baseline = timed(serializer_path, args.repeat)
+    fast = timed(plan_path, args.repeat)
+    print(f'{"path":<36} {"p50":>9}')
+    print(f'{"BudgetSerializer + JSONRenderer":<36} {baseline:>7.1f}ms')
+    print(f'{"field plan + " + encoder:<36} {fast:>7.1f}ms  ({baseline / fast:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for the REST API. Seeds a throwaway test database, replays
+scripted workloads in-process and reports latency percentiles, throughput and
+queries per request for each endpoint.
+
+Runs offline against SQLite by default (backend.settings_benchmark); set
+BENCHMARK_DATABASE=mysql to use a local MySQL container instead.
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings_benchmark')
+
+from seed import PASSWORD, seed  # noqa: E402
+from loadtest import percentile  # noqa: E402
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+
+def login(client, user, n):
+    return client.post('/api/auth/login/', {'username': user.username, 'password': PASSWORD}, format='json')
+
+
+def get_budget(client, user, n):
+    return client.get(f'/api/budget/get/{user.budget_ids[n % len(user.budget_ids)]}/')
+
+
+def list_budgets(client, user, n):
+    return client.get('/api/budget/get_all_current/')
+
+
+def bulk_insert(client, user, n):
+    rows = [
+        {'cost': '12.34', 'store': 'Bench', 'payback_amount': '0.00', 'date': '2024-06-01',
+         'category': user.category_ids[(n + i) % len(user.category_ids)]}
+        for i in range(100)
+    ]
+    return client.post('/api/budget/expenses/bulk/', rows, format='json')
+
+
+# Workload name -> (request function, authenticated)
+WORKLOADS = {
+    'login': (login, False),
+    'get_budget': (get_budget, True),
+    'list': (list_budgets, True),
+    'bulk_insert': (bulk_insert, True),
+}
+
+
+def run_workload(name, users, requests, warmup, cold=False):
+    send, authenticated = WORKLOADS[name]
+    clients = []
+    for user in users:
+        client = APIClient()
+        if authenticated:
+            client.credentials(HTTP_AUTHORIZATION='Token ' + user.token)
+        clients.append(client)
+
+    for n in range(warmup):
+        send(clients[n % len(users)], users[n % len(users)], n)
+
+    latencies = []
+    queries = []
+    errors = 0
+    timed = 0.0
+    for n in range(requests):
+        client, user = clients[n % len(users)], users[n % len(users)]
+        if cold:
+            # Outside the timing: measure the read path rather than a cache hit
+            caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = send(client, user, n)
+            latencies.append(time.perf_counter() - request_started)
+        timed += latencies[-1]
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            errors += 1
+    return {
+        'requests': requests,
+        'errors': errors,
+        'throughput': requests / timed if timed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'queries': statistics.mean(queries),
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare results with a saved run: p95 latency may grow by at most threshold
+    (a fraction), and the queries per request may not grow at all.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.1f} ms vs {previous['p95_ms']:.1f} ms")
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: {result['queries']:.1f} queries/request vs {previous['queries']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10, help='Seeded users.')
+    parser.add_argument('--budgets', type=int, default=2, help='Budgets per user.')
+    parser.add_argument('--categories', type=int, default=5, help='Categories per budget.')
+    parser.add_argument('--expenses', type=int, default=200, help='Expenses per category.')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per workload.')
+    parser.add_argument('--login-requests', type=int, default=20,
+                        help='Timed logins; each one costs a full password hash.')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per workload.')
+    parser.add_argument('--cold', action='store_true',
+                        help='Clear the response cache before every request.')
+    parser.add_argument('--workload', action='append', choices=sorted(WORKLOADS),
+                        help='Workload to run; repeat for several (default: all).')
+    parser.add_argument('--save', help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', help='Compare with results saved by --save.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed p95 latency growth over the baseline, as a fraction.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        for cache in caches.all():
+            cache.clear()
+
+        started = time.perf_counter()
+        users = seed(args.users, args.budgets, args.categories, args.expenses)
+        total = args.users * args.budgets * args.categories * args.expenses
+        print(f'{connection.vendor}: seeded {args.users} users, {total} expenses '
+              f'in {time.perf_counter() - started:.1f}s')
+
+        results = {}
+        print(f"{'workload':<12} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for name in args.workload or list(WORKLOADS):
+            requests = args.login_requests if name == 'login' else args.requests
+            result = results[name] = run_workload(name, users, requests, args.warmup, args.cold)
+            print(f"{name:<12} {result['requests']:>8} {result['errors']:>6} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                  f"{result['queries']:>8.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        if regressions:
+            print('Regressions:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print('No regressions against the baseline.')
+
+    if any(result['errors'] for result in results.values()):
+        sys.exit('Some requests failed.')
+
+
+if __name__ == '__main__':
+    main()
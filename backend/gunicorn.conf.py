@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for serving backend in production.
+
+WSGI (threaded workers):
+    gunicorn backend.wsgi
+ASGI (uvicorn workers):
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn backend.asgi
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:7004')
+
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Token, budget version and throttle state must be shared between workers;
+# each worker would otherwise keep its own local-memory cache
+if workers > 1 and not os.environ.get('REDIS_URL'):
+    raise RuntimeError('Set REDIS_URL to a shared cache when running more than one worker.')
+
+# Threads per worker, only used by the gthread worker class
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically so slow leaks cannot build up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = '-'